@@ -1,5 +1,7 @@
 import requests
+import hashlib
 import json
+import marshal
 import os
 import sys
 from datetime import datetime
@@ -32,6 +34,11 @@ else:
 DATA_DIR = resource_path('data')
 LOCALIZATIONS_DIR = resource_path('localizations')
 
+# Precompiled reference tables, built with 'python gacha_api.py bundle' (same format)
+REFERENCE_BUNDLE_PATH = resource_path('data/reference_data.bundle')
+BUNDLE_MAGIC = b"VTRB"
+BUNDLE_VERSION = 3
+
 # Create folders if they don't exist (only in development, in EXE they already exist)
 if not getattr(sys, 'frozen', False):
     os.makedirs(DATA_DIR, exist_ok=True)
@@ -137,19 +144,90 @@ class ConfigManager:
         cls._config = config
         return cls.save_config()
 
+def bundle_source_changed(relative_path, stamp, bundle_mtime_ns):
+    """Whether a source file no longer matches the (size, SHA-256) stamp stored in the bundle
+    
+    A different size is a change, and a file not modified after the bundle was
+    built is unchanged; only files modified after it are read and hashed.
+    Missing files do not count as changed.
+    """
+    try:
+        stat = os.stat(resource_path(relative_path))
+    except OSError:
+        return False
+    if stat.st_size != stamp[0]:
+        return True
+    if stat.st_mtime_ns <= bundle_mtime_ns:
+        return False
+    with open(resource_path(relative_path), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest() != stamp[1]
+
+def load_reference_bundle(path=REFERENCE_BUNDLE_PATH):
+    """Read the precompiled reference bundle; None if missing, from another version or outdated
+    
+    In the EXE the sources are not checked: the bundle is checked when it is
+    built ('python gacha_api.py bundle --check', see the compilation ReadMe).
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        bundle_mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, 'rb') as f:
+            header = f.read(len(BUNDLE_MAGIC) + 2)
+            if header[:len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+                return None
+            if int.from_bytes(header[len(BUNDLE_MAGIC):], 'little') != BUNDLE_VERSION:
+                return None
+            bundle = marshal.loads(f.read())
+    except Exception as e:
+        print(f"âŒ Error loading reference bundle: {e}")
+        return None
+    
+    if not getattr(sys, 'frozen', False):
+        for relative, stamp in bundle['sources'].items():
+            if stamp is not None and bundle_source_changed(relative, stamp, bundle_mtime_ns):
+                print(f"âš ï¸  {relative} changed since the bundle was built: using the JSON files")
+                return None
+    
+    print(f"âœ… Reference bundle loaded: {len(bundle['tables'])} tables, {len(bundle['localizations'])} languages")
+    return bundle
+
 class DataManager:
-    """External data manager - Reads from JSON files"""
+    """External data manager - Reads from the reference bundle or the JSON files"""
     _dolls = None
     _weapons = None
     _mbox = None
     _weapon_banners = None
     _promotional_banners = None
     _localization = None
+    _localization_flat = False  # Bundled translations are flat: {'ui.title': ...}
     _current_language = "EN"
+    _bundle = None  # None = not read yet, False = not available
+    
+    @classmethod
+    def load_bundle(cls):
+        """Reference bundle, read once; None if not available"""
+        if cls._bundle is None:
+            cls._bundle = load_reference_bundle() or False
+        return cls._bundle or None
+    
+    @classmethod
+    def get_bundled_table(cls, name):
+        """Table from the reference bundle, or None to read the JSON file"""
+        bundle = cls.load_bundle()
+        return bundle['tables'].get(name) if bundle else None
+    
+    @classmethod
+    def get_bundled_localization(cls, language):
+        """Flat translations (English fallback already merged) from the bundle, or None"""
+        bundle = cls.load_bundle()
+        return bundle['localizations'].get(language) if bundle else None
     
     @classmethod
     def load_dolls(cls):
         """Load characters dictionary from data/dolls.json"""
+        if cls._dolls is None:
+            cls._dolls = cls.get_bundled_table('dolls')
         if cls._dolls is None:
             try:
                 dolls_path = resource_path('data/dolls.json')
@@ -165,6 +243,8 @@ class DataManager:
     @classmethod
     def load_weapons(cls):
         """Load weapons dictionary from data/weapons.json"""
+        if cls._weapons is None:
+            cls._weapons = cls.get_bundled_table('weapons')
         if cls._weapons is None:
             try:
                 weapons_path = resource_path('data/weapons.json')
@@ -180,6 +260,8 @@ class DataManager:
     @classmethod
     def load_mbox(cls):
         """Load mbox dictionary from data/mbox.json"""
+        if cls._mbox is None:
+            cls._mbox = cls.get_bundled_table('mbox')
         if cls._mbox is None:
             try:
                 mbox_path = resource_path('data/mbox.json')
@@ -195,6 +277,8 @@ class DataManager:
     @classmethod
     def load_weapon_banners(cls):
         """Load weapon banners dictionary from data/weapon_banners.json"""
+        if cls._weapon_banners is None:
+            cls._weapon_banners = cls.get_bundled_table('weapon_banners')
         if cls._weapon_banners is None:
             try:
                 weapon_banners_path = resource_path('data/weapon_banners.json')
@@ -210,6 +294,8 @@ class DataManager:
     @classmethod
     def load_promotional_banners(cls):
         """Load promotional banners dictionary from data/promotional_banners.json"""
+        if cls._promotional_banners is None:
+            cls._promotional_banners = cls.get_bundled_table('promotional_banners')
         if cls._promotional_banners is None:
             try:
                 promotional_banners_path = resource_path('data/promotional_banners.json')
@@ -228,6 +314,13 @@ class DataManager:
         if language:
             cls._current_language = language
         
+        bundled = cls.get_bundled_localization(cls._current_language)
+        if bundled is not None:
+            cls._localization = bundled
+            cls._localization_flat = True
+            return cls._localization
+        
+        cls._localization_flat = False
         try:
             localization_path = resource_path(f'localizations/localization_{cls._current_language}.json')
             with open(localization_path, 'r', encoding='utf-8') as f:
@@ -255,6 +348,12 @@ class DataManager:
         if cls._localization is None:
             cls.load_localization()
         
+        if cls._localization_flat:
+            value = cls._localization.get(key)
+            if value is not None:
+                return value
+            return default if default is not None else key
+        
         keys = key.split('.')
         value = cls._localization
         try:
@@ -0,0 +1,260 @@
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from gacha_api import MultiIndex, get_item_name, group_by_banner_name
+from pull_planner import RULE_SETS, get_pity_intervals, scan_pity
+from quantile_sketch import KLLSketch
+
+SKETCH_VERSION = 4
+SKETCH_METRICS = tuple(f"pity_{rule}" for rule in RULE_SETS) + ("pulls_per_day", "spend_per_banner")
+REPORT_QUANTILES = (0.1, 0.5, 0.9, 0.99)
+
+
+def _count_days_and_banners(records, days, banners):
+    """Adds the records to the per-day and per-banner pull counts (JSON keys)"""
+    for record in records:
+        days[str(record['time'] // 86400)] += 1
+        banners[str(record['pool_id'])] += 1
+
+
+def _pack_store_sketches(record_count, pity_sketches, pity_state, days, banners):
+    """The stored form: the metrics plus what is needed to extend them later
+
+    A per-day or per-banner count still grows when newer pulls land on the
+    same day or banner, and a sketch cannot take a value back, so those two
+    sketches are rebuilt from the (small) count tables instead.
+    """
+    metrics = {f"pity_{rule}": pity_sketches[rule].to_dict() for rule in RULE_SETS}
+    metrics["pulls_per_day"] = KLLSketch().extend(days.values()).to_dict()
+    metrics["spend_per_banner"] = KLLSketch().extend(banners.values()).to_dict()
+    return {
+        'version': SKETCH_VERSION,
+        'records': record_count,
+        'metrics': metrics,
+        'state': {'pity': pity_state, 'days': dict(days), 'banners': dict(banners)}
+    }
+
+
+def build_store_sketches(records):
+    """Quantile sketches of one account, as stored in its backup file"""
+    pity_sketches = {}
+    pity_state = {}
+    for rule in RULE_SETS:
+        intervals, tail = scan_pity(records, rule)
+        # The first 5★ may include pity carried from before the history starts
+        pity_sketches[rule] = KLLSketch().extend(intervals[1:])
+        pity_state[rule] = {'tail': tail, 'seen_5': bool(intervals)}
+
+    days, banners = Counter(), Counter()
+    _count_days_and_banners(records, days, banners)
+    return _pack_store_sketches(len(records), pity_sketches, pity_state, days, banners)
+
+
+def advance_store_sketches(stored, newer_records, record_count):
+    """Stored sketches extended with pulls newer than all the ones they cover
+
+    Only the new pulls are scanned: the pity tail carried in the stored state
+    completes the first new interval. Returns None if `stored` is missing, out
+    of date or does not add up to `record_count`, so the caller rebuilds.
+    """
+    if (not stored or stored.get('version') != SKETCH_VERSION or
+            stored.get('records', 0) + len(newer_records) != record_count):
+        return None
+    state = stored['state']
+
+    pity_sketches = {}
+    pity_state = {}
+    for rule in RULE_SETS:
+        sketch = KLLSketch.from_dict(stored['metrics'][f"pity_{rule}"])
+        previous = state['pity'][rule]
+        intervals, tail = scan_pity(newer_records, rule)
+        if intervals:
+            intervals[0] += previous['tail']
+            # Until the first 5★ the interval is still the one left out
+            sketch.extend(intervals if previous['seen_5'] else intervals[1:])
+            pity_state[rule] = {'tail': tail, 'seen_5': True}
+        else:
+            pity_state[rule] = {'tail': previous['tail'] + tail, 'seen_5': previous['seen_5']}
+        pity_sketches[rule] = sketch
+
+    days, banners = Counter(state['days']), Counter(state['banners'])
+    _count_days_and_banners(newer_records, days, banners)
+    return _pack_store_sketches(record_count, pity_sketches, pity_state, days, banners)
+
+
+def load_store_sketches(data):
+    """Sketches carried by a store, rebuilt if missing or out of date"""
+    stored = data.get('sketches')
+    if (not stored or stored.get('version') != SKETCH_VERSION or
+            stored.get('records') != len(data['records'])):
+        stored = build_store_sketches(data['records'])
+    return {metric: KLLSketch.from_dict(sketch) for metric, sketch in stored['metrics'].items()}
+
+
+class FleetAggregate:
+    """Mergeable statistics for any number of accounts
+
+    Every field is a count, so aggregates built in different processes can
+    be combined with `merge` in any order and give the same result.
+    """
+
+    def __init__(self):
+        self.accounts = 0
+        self.total_pulls = 0
+        self.multi_count = 0
+        self.rarities = Counter()
+        self.banners = Counter()
+        self.pity = {rule: Counter() for rule in RULE_SETS}
+        self.sketches = {metric: KLLSketch() for metric in SKETCH_METRICS}
+        self.failed = []
+
+    def add_records(self, records, multi_count=0, sketches=None):
+        """Adds one account's records, merging its stored sketches if given"""
+        self.accounts += 1
+        self.total_pulls += len(records)
+        self.multi_count += multi_count
+
+        for record in records:
+            self.banners[record['pool_id']] += 1
+            _, rarity = get_item_name(record['item'])
+            self.rarities[rarity] += 1
+
+        for rule in RULE_SETS:
+            # The first 5★ may include pity carried from before the history starts
+            self.pity[rule].update(get_pity_intervals(records, rule)[1:])
+
+        if sketches is None:
+            sketches = load_store_sketches({'records': records})
+        for metric, sketch in sketches.items():
+            self.sketches[metric].merge(sketch)
+        return self
+
+    def merge(self, other):
+        """Adds another partial aggregate into this one"""
+        self.accounts += other.accounts
+        self.total_pulls += other.total_pulls
+        self.multi_count += other.multi_count
+        self.rarities.update(other.rarities)
+        self.banners.update(other.banners)
+        for rule in RULE_SETS:
+            self.pity[rule].update(other.pity[rule])
+        for metric in SKETCH_METRICS:
+            self.sketches[metric].merge(other.sketches[metric])
+        self.failed.extend(other.failed)
+        return self
+
+    def to_report(self):
+        """Plain dict with the combined report"""
+        rarity_rates = {
+            rarity: count / self.total_pulls
+            for rarity, count in sorted(self.rarities.items(), reverse=True)
+        } if self.total_pulls else {}
+
+        return {
+            'accounts': self.accounts,
+            'total_pulls': self.total_pulls,
+            'multi_count': self.multi_count,
+            'rarity_counts': dict(sorted(self.rarities.items(), reverse=True)),
+            'rarity_rates': rarity_rates,
+            'banner_pools': dict(self.banners.most_common()),
+            'banner_groups': group_by_banner_name(self.banners),
+            'pity': {rule: summarize_histogram(self.pity[rule]) for rule in RULE_SETS},
+            'quantiles': {
+                metric: {str(q): sketch.quantile(q) for q in REPORT_QUANTILES}
+                for metric, sketch in self.sketches.items()
+            },
+            'failed': self.failed,
+        }
+
+    def account_percentiles(self, account_sketches):
+        """Where an account's median of each metric falls in the fleet (0-100)"""
+        percentiles = {}
+        for metric, sketch in account_sketches.items():
+            median = sketch.quantile(0.5)
+            fleet_rank = self.sketches[metric].rank(median) if median is not None else None
+            percentiles[metric] = {
+                'median': median,
+                'percentile': fleet_rank * 100 if fleet_rank is not None else None
+            }
+        return percentiles
+
+
+def summarize_histogram(histogram):
+    """Count, mean, median and full histogram of a pity distribution"""
+    total = sum(histogram.values())
+    if not total:
+        return {'count': 0, 'mean': None, 'median': None, 'histogram': {}}
+
+    mean = sum(value * count for value, count in histogram.items()) / total
+    cumulative = 0
+    median = None
+    for value in sorted(histogram):
+        cumulative += histogram[value]
+        if cumulative * 2 >= total:
+            median = value
+            break
+
+    return {
+        'count': total,
+        'mean': mean,
+        'median': median,
+        'histogram': dict(sorted(histogram.items())),
+    }
+
+
+def is_store_name(name):
+    """backup.json and renamed copies such as player1_backup.json"""
+    name = name.lower()
+    # The derived-statistics sidecars are named backup.cache.json
+    return 'backup' in name and name.endswith('.json') and not name.endswith('.cache.json')
+
+
+def find_stores(directory, exclude=()):
+    """Every backup file under a directory, leaving out the paths in `exclude`
+
+    config.json, cache/ files or a previous --json report in the same
+    directory are not stores and are not reported as failures.
+    """
+    excluded = {os.path.abspath(path) for path in exclude}
+    stores = []
+    for root, _dirs, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            if is_store_name(name) and os.path.abspath(path) not in excluded:
+                stores.append(path)
+    return sorted(stores)
+
+
+def summarize_store(path):
+    """Partial aggregate of one backup file (runs in a worker process)"""
+    aggregate = FleetAggregate()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        records = data['records']
+        if not isinstance(records, list):
+            raise ValueError("'records' is not a list")
+        sketches = load_store_sketches(data)
+    except Exception as e:
+        aggregate.failed.append((path, str(e)))
+        return aggregate
+
+    return aggregate.add_records(records, len(MultiIndex(records)), sketches)
+
+
+def aggregate_directory(directory, workers=None, exclude=()):
+    """Scans a directory of stores in parallel and merges their statistics"""
+    stores = find_stores(directory, exclude)
+    result = FleetAggregate()
+    if not stores:
+        return result
+
+    workers = workers or os.cpu_count() or 1
+    # Several stores per task keep the pickling overhead low for small files
+    chunksize = max(1, len(stores) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(summarize_store, stores, chunksize=chunksize):
+            result.merge(partial)
+    return result
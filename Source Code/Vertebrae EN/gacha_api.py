@@ -1,8 +1,18 @@
 import requests
+import argparse
 import json
 import os
 import sys
+from array import array
+from bisect import bisect_right
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
+import hashlib
+import marshal
+import multiprocessing
+import threading
+import time
 from urllib.parse import urlencode
 import urllib3
 
@@ -19,6 +29,27 @@ else:
 
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 LOCALIZATIONS_DIR = os.path.join(BASE_DIR, 'localizations')
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+# Log completo de las importaciones (opcional, con rotación)
+IMPORT_LOG_FILE = os.path.join(BASE_DIR, 'logs', 'import.log')
+
+# Idioma cuyas traducciones completan las claves que falten en los demás
+FALLBACK_LANGUAGE = "EN"
+
+# Paquete precompilado con todos los datos de referencia (ver build_reference_bundle)
+REFERENCE_BUNDLE_PATH = os.path.join(DATA_DIR, 'reference_data.bundle')
+BUNDLE_MAGIC = b"VTRB"
+BUNDLE_VERSION = 3
+
+# Tablas de data/ y si sus claves son IDs numéricos
+REFERENCE_TABLES = (
+    ('dolls', 'dolls.json', True),
+    ('weapons', 'weapons.json', True),
+    ('mbox', 'mbox.json', True),
+    ('weapon_banners', 'weapon_banners.json', True),
+    ('promotional_banners', 'promotional_banners.json', True),
+    ('banner_rules', 'banner_rules.json', False),
+)
 
 # Crear carpetas si no existen
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -80,7 +111,9 @@ class ConfigManager:
                     "request_timeout": 20,
                     "max_retries": 3,
                     "default_language": "EN",
-                    "theme": "system"
+                    "theme": "system",
+                    "log_max_lines": 1000,
+                    "log_to_file": False
                 }
             }
             
@@ -131,12 +164,113 @@ class DataManager:
     _mbox = None
     _weapon_banners = None
     _promotional_banners = None
+    _banner_rules = None
     _localization = None
+    _localizations = {}  # idioma -> tabla compilada, para cambiar de idioma sin releer
     _current_language = "EN"
+    _bundle = None  # None = sin leer, False = no disponible
+    _bundle_lock = threading.Lock()
+    _watched_signature = None  # Firmas de los archivos vistas en la última comprobación
+    
+    @classmethod
+    def load_bundle(cls):
+        """Paquete precompilado de datos de referencia, o None si falta o está desactualizado"""
+        with cls._bundle_lock:
+            if cls._bundle is None:
+                cls._bundle = read_reference_bundle() or False
+        return cls._bundle or None
+    
+    @classmethod
+    def reference_signature(cls):
+        """(tamaño, fecha de modificación) de cada archivo de referencia, por nombre de fuente"""
+        signature = {name: _source_signature(os.path.join('data', filename))
+                     for name, filename, _numeric in REFERENCE_TABLES}
+        for relative in _reference_sources():
+            filename = os.path.basename(relative)
+            if relative.startswith('localizations'):
+                signature[filename[:-len('.json')]] = _source_signature(relative)
+        signature['bundle'] = _source_signature(os.path.relpath(REFERENCE_BUNDLE_PATH, BASE_DIR))
+        return signature
+    
+    @classmethod
+    def get_data_fingerprint(cls):
+        """Huella corta de las tablas de data/ (no de las traducciones) para invalidar cachés derivadas"""
+        signature = cls.reference_signature()
+        tables = [(name, signature[name]) for name, _filename, _numeric in REFERENCE_TABLES]
+        tables.append(('bundle', signature['bundle']))
+        return hashlib.sha1(repr(tables).encode('utf-8')).hexdigest()[:16]
+    
+    @classmethod
+    def snapshot_reference_data(cls):
+        """Guarda las firmas actuales como punto de partida para reload_changed"""
+        cls._watched_signature = cls.reference_signature()
+    
+    @classmethod
+    def reload_changed(cls):
+        """Recarga en caliente los datos de referencia que cambiaron en disco
+        
+        Descarta solo las tablas afectadas (se releen en el próximo acceso),
+        recarga la localización activa si cambió y limpia las tablas de items
+        y banners que dependen de ellas. Devuelve los nombres de las fuentes
+        modificadas (vacío si no cambió nada).
+        """
+        current = cls.reference_signature()
+        previous = cls._watched_signature
+        cls._watched_signature = current
+        if previous is None:
+            return set()
+        
+        changed = {name for name, signature in current.items() if previous.get(name) != signature}
+        if not changed:
+            return changed
+        
+        with cls._bundle_lock:
+            bundle_in_use = bool(cls._bundle)
+            cls._bundle = None
+        if 'bundle' in changed or bundle_in_use:
+            # Las tablas venían del paquete: cualquier cambio puede afectarlas todas
+            changed |= {name for name, _filename, _numeric in REFERENCE_TABLES}
+            changed.add(f"localization_{cls._current_language}")
+        
+        for name, _filename, _numeric in REFERENCE_TABLES:
+            if name in changed:
+                setattr(cls, f"_{name}", None)
+        
+        changed_languages = {name[len('localization_'):] for name in changed
+                             if name.startswith('localization_')}
+        if changed_languages:
+            if FALLBACK_LANGUAGE in changed_languages:
+                # El fallback está mezclado en todos los idiomas
+                cls._localizations = {}
+            else:
+                cls._localizations = {language: table for language, table in cls._localizations.items()
+                                      if language not in changed_languages}
+            if cls._current_language in changed_languages or FALLBACK_LANGUAGE in changed_languages:
+                cls.load_localization()
+        
+        if changed_languages or changed & {'dolls', 'weapons', 'mbox'}:
+            ItemResolver.invalidate()
+        if changed_languages or changed & {'weapon_banners', 'promotional_banners'}:
+            BannerClassifier.invalidate()
+        return changed
+    
+    @classmethod
+    def get_bundled_table(cls, name):
+        """Tabla de data/ tomada del paquete precompilado, si lo hay"""
+        bundle = cls.load_bundle()
+        return bundle['tables'].get(name) if bundle else None
+    
+    @classmethod
+    def get_bundled_localization(cls, language):
+        """Traducciones ya aplanadas de un idioma tomadas del paquete precompilado, si lo hay"""
+        bundle = cls.load_bundle()
+        return bundle['localizations'].get(language) if bundle else None
     
     @classmethod
     def load_dolls(cls):
         """Carga el diccionario de personajes desde data/dolls.json"""
+        if cls._dolls is None:
+            cls._dolls = cls.get_bundled_table('dolls')
         if cls._dolls is None:
             try:
                 dolls_path = os.path.join(DATA_DIR, 'dolls.json')
@@ -151,6 +285,8 @@ class DataManager:
     @classmethod
     def load_weapons(cls):
         """Carga el diccionario de armas desde data/weapons.json"""
+        if cls._weapons is None:
+            cls._weapons = cls.get_bundled_table('weapons')
         if cls._weapons is None:
             try:
                 weapons_path = os.path.join(DATA_DIR, 'weapons.json')
@@ -165,6 +301,8 @@ class DataManager:
     @classmethod
     def load_mbox(cls):
         """Carga el diccionario de mbox desde data/mbox.json"""
+        if cls._mbox is None:
+            cls._mbox = cls.get_bundled_table('mbox')
         if cls._mbox is None:
             try:
                 mbox_path = os.path.join(DATA_DIR, 'mbox.json')
@@ -180,6 +318,8 @@ class DataManager:
     @classmethod
     def load_weapon_banners(cls):
         """Carga el diccionario de banners de armas desde data/weapon_banners.json"""
+        if cls._weapon_banners is None:
+            cls._weapon_banners = cls.get_bundled_table('weapon_banners')
         if cls._weapon_banners is None:
             try:
                 weapon_banners_path = os.path.join(DATA_DIR, 'weapon_banners.json')
@@ -195,6 +335,8 @@ class DataManager:
     @classmethod
     def load_promotional_banners(cls):
         """Carga el diccionario de banners promocionales desde data/promotional_banners.json"""
+        if cls._promotional_banners is None:
+            cls._promotional_banners = cls.get_bundled_table('promotional_banners')
         if cls._promotional_banners is None:
             try:
                 promotional_banners_path = os.path.join(DATA_DIR, 'promotional_banners.json')
@@ -206,6 +348,114 @@ class DataManager:
                 print(f"❌ Error cargando promotional_banners.json: {e}")
                 cls._promotional_banners = {}
         return cls._promotional_banners
+
+    @classmethod
+    def load_banner_rules(cls):
+        """Carga las reglas de pity por tipo de banner desde data/banner_rules.json"""
+        if cls._banner_rules is None:
+            cls._banner_rules = cls.get_bundled_table('banner_rules')
+        if cls._banner_rules is None:
+            try:
+                banner_rules_path = os.path.join(DATA_DIR, 'banner_rules.json')
+                with open(banner_rules_path, 'r', encoding='utf-8') as f:
+                    cls._banner_rules = json.load(f)
+                print(f"✅ banner_rules.json cargado: {len(cls._banner_rules)} reglas de banner")
+            except Exception as e:
+                print(f"❌ Error cargando banner_rules.json: {e}")
+                cls._banner_rules = {}
+        return cls._banner_rules
+
+    @staticmethod
+    def flatten_localization(data, prefix=""):
+        """Convierte el JSON anidado en un diccionario plano con claves 'seccion.clave'"""
+        flat = {}
+        for key, value in data.items():
+            full_key = f"{prefix}{key}"
+            if isinstance(value, dict):
+                flat.update(DataManager.flatten_localization(value, f"{full_key}."))
+            else:
+                flat[full_key] = value
+        return flat
+    
+    @classmethod
+    def compile_localization(cls, language):
+        """Tabla plana del idioma con el fallback ya mezclado, o None si el idioma no se puede cargar
+        
+        La tabla compilada se guarda en cache/ junto con las fechas de
+        modificación de sus archivos de origen, y se reutiliza mientras no cambien.
+        """
+        languages = [FALLBACK_LANGUAGE, language] if language != FALLBACK_LANGUAGE else [language]
+        sources = [os.path.join(LOCALIZATIONS_DIR, f'localization_{lang}.json') for lang in languages]
+        signature = []
+        for path in sources:
+            try:
+                signature.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        
+        cache_path = os.path.join(CACHE_DIR, f'localization_{language}.json')
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('signature') == signature:
+                return cached['table']
+        except (OSError, ValueError):
+            pass
+        
+        table = {}
+        for lang, path in zip(languages, sources):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    table.update(cls.flatten_localization(json.load(f)))
+            except Exception as e:
+                print(f"❌ Error cargando localization_{lang}.json: {e}")
+                if lang == language:
+                    return None
+        
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _write_json_atomic(cache_path, {'signature': signature, 'table': table})
+        except Exception as e:
+            print(f"⚠️  No se pudo guardar la localización compilada: {e}")
+        return table
+    
+    @classmethod
+    def get_available_languages(cls):
+        """Idiomas instalados: archivos localization_XX.json y los incluidos en el paquete"""
+        languages = set()
+        if os.path.isdir(LOCALIZATIONS_DIR):
+            for filename in os.listdir(LOCALIZATIONS_DIR):
+                if filename.startswith('localization_') and filename.endswith('.json'):
+                    languages.add(filename[len('localization_'):-len('.json')])
+        bundle = cls.load_bundle()
+        if bundle:
+            languages.update(bundle['localizations'])
+        return sorted(languages)
+    
+    @classmethod
+    def get_localization(cls, language):
+        """Tabla compilada de un idioma (cualquiera, no solo el activo), o None si no existe
+        
+        Se compila la primera vez que se pide y queda en memoria, de modo que
+        volver a un idioma ya usado no lee ningún archivo.
+        """
+        table = cls._localizations.get(language)
+        if table is None:
+            table = cls.get_bundled_localization(language)
+            if table is None:
+                table = cls.compile_localization(language)
+            if table is not None:
+                cls._localizations[language] = table
+        return table
+    
+    @classmethod
+    def translate(cls, language, key, default=None):
+        """Como get_text, pero en un idioma concreto sin cambiar el activo"""
+        localization = cls.get_localization(language) or cls.get_localization(FALLBACK_LANGUAGE) or {}
+        value = localization.get(key)
+        if value is None:
+            return default if default is not None else key
+        return value
     
     @classmethod
     def load_localization(cls, language=None):
@@ -213,47 +463,34 @@ class DataManager:
         if language:
             cls._current_language = language
         
-        try:
-            localization_path = os.path.join(LOCALIZATIONS_DIR, f'localization_{cls._current_language}.json')
-            with open(localization_path, 'r', encoding='utf-8') as f:
-                cls._localization = json.load(f)
+        table = cls.get_localization(cls._current_language)
+        if table is not None:
+            cls._localization = table
             print(f"✅ Localización cargada: {cls._current_language}")
-        except Exception as e:
-            print(f"❌ Error cargando localization_{cls._current_language}.json: {e}")
-            # Fallback a español
-            if cls._current_language != "EN":
-                print("🔄 Intentando cargar español como fallback...")
-                cls._current_language = "EN"
-                cls.load_localization()
-            else:
-                cls._localization = {}
-                print("❌ No se pudo cargar ningún archivo de localización")
+        elif cls._current_language != FALLBACK_LANGUAGE:
+            print("🔄 Intentando cargar inglés como fallback...")
+            cls._current_language = FALLBACK_LANGUAGE
+            cls.load_localization()
+        else:
+            cls._localization = {}
+            print("❌ No se pudo cargar ningún archivo de localización")
         return cls._localization
     
     @classmethod
     def get_text(cls, key, default=None):
         """Obtiene texto traducido usando notación de puntos: 'ui.title'"""
-        if cls._localization is None:
-            cls.load_localization()
-        
-        # Primero intentar cargar la localización si no está cargada
-        if cls._localization is None:
-            cls.load_localization()
+        localization = cls._localization
+        if localization is None:
+            localization = cls.load_localization()
         
-        keys = key.split('.')
-        value = cls._localization
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
+        value = localization.get(key)
+        if value is None:
             return default if default is not None else key
+        return value
     
     @classmethod
     def set_language(cls, language):
-        """Cambia el idioma de la aplicación"""
-        cls._current_language = language
-        cls._localization = None  # Forzar recarga
+        """Cambia el idioma de la aplicación (instantáneo si ya se usó antes)"""
         return cls.load_localization(language)
 
 class LocalizationManager:
@@ -278,10 +515,515 @@ class LocalizationManager:
 # Alias corto para uso fácil
 _ = LocalizationManager.get_text
 
+# Códigos de tipo de item
+ITEM_OTHER, ITEM_CHARACTER, ITEM_WEAPON, ITEM_MBOX = range(4)
+ITEM_TYPE_NAMES = ("other", "character", "weapon", "mbox")
+
+class ItemResolver:
+    """Tabla plana item_id -> (nombre traducido, rareza, código de tipo)
+    
+    Se compila una vez por idioma a partir de dolls/weapons/mbox y se guarda
+    en memoria; al cambiar de idioma se reemplaza la tabla activa (una sola
+    asignación), así que resolver un item es un solo acceso a diccionario.
+    """
+    _state = (None, None)  # (idioma, tabla) activos
+    _tables = {}  # idioma -> tabla
+    
+    @classmethod
+    def build_table(cls, language=None):
+        """Compila la tabla para un idioma (por defecto, el actual)"""
+        language = language or DataManager._current_language
+        table = {}
+        # De menor a mayor prioridad: personajes pisan armas, y armas pisan mbox
+        sources = (
+            (DataManager.load_mbox(), ITEM_MBOX, "Mbox"),
+            (DataManager.load_weapons(), ITEM_WEAPON, "Arma"),
+            (DataManager.load_dolls(), ITEM_CHARACTER, "Personaje"),
+        )
+        for items, type_code, fallback in sources:
+            for item_id, item in items.items():
+                item_name = DataManager.translate(language, item["name_key"], f"{fallback} {item_id}")
+                table[item_id] = (item_name, item["rarity"], type_code)
+        return table
+    
+    @classmethod
+    def get_table(cls, language=None):
+        """Tabla de un idioma (por defecto, el actual), compilada la primera vez que se pide"""
+        current = DataManager._current_language
+        language = language or current
+        active_language, table = cls._state
+        if table is not None and active_language == language:
+            return table
+        
+        table = cls._tables.get(language)
+        if table is None:
+            table = cls.build_table(language)
+            cls._tables[language] = table
+        if language == current:
+            cls._state = (language, table)
+        return table
+    
+    @classmethod
+    def invalidate(cls):
+        """Descarta las tablas de todos los idiomas (p. ej. si cambian los archivos de datos)"""
+        cls._tables = {}
+        cls._state = (None, None)
+    
+    @staticmethod
+    def unknown(item_id):
+        """Entrada para items que no están en ningún diccionario"""
+        return (f"Item {item_id}", 3, ITEM_OTHER)
+    
+    @classmethod
+    def resolve(cls, item_id):
+        """(nombre, rareza, código de tipo) de un item"""
+        entry = cls.get_table().get(item_id)
+        return entry if entry is not None else cls.unknown(item_id)
+
+# Códigos de familia de banner; el nombre traducido se aplica solo al mostrar
+(BANNER_CHARACTERS, BANNER_WEAPONS, BANNER_SPECIAL, BANNER_BEGINNER, BANNER_EVENT,
+ BANNER_PERMANENT, BANNER_MYSTERY_BOX, BANNER_PROMOTIONAL) = range(8)
+BANNER_FAMILY_KEYS = ("characters", "weapons", "special", "beginner", "event",
+                      "permanent", "mystery_box", "promotional")
+
+# Banners especiales que tienen IDs específicos FIJOS
+SPECIAL_BANNERS = {
+    130002: BANNER_WEAPONS,
+    130003: BANNER_CHARACTERS,
+    130004: BANNER_SPECIAL,
+    130005: BANNER_BEGINNER,
+    130008: BANNER_EVENT,
+    1001: BANNER_PERMANENT,
+    99001: BANNER_MYSTERY_BOX
+}
+
+# type_id que se consultan al importar y su familia de banner (mismo número que los pools 13000X)
+IMPORT_TYPE_IDS = {
+    '1': BANNER_PROMOTIONAL,
+    '3': BANNER_CHARACTERS,
+    '4': BANNER_SPECIAL,
+    '5': BANNER_BEGINNER,
+    '8': BANNER_EVENT
+}
+
+class BannerClassifier:
+    """Mapa precalculado pool_id -> código de familia de banner
+    
+    Se construye una vez a partir de SPECIAL_BANNERS y de los JSON de banners,
+    y se reconstruye solo si cambia la fecha de modificación de esos archivos.
+    """
+    BANNER_FILES = ('weapon_banners.json', 'promotional_banners.json')
+    _state = (None, None)  # (firma de los archivos, mapa)
+    _labels = {}  # idioma -> nombres traducidos por código
+    
+    @classmethod
+    def _files_signature(cls):
+        """Fechas de modificación de los JSON de banners"""
+        signature = []
+        for filename in cls.BANNER_FILES:
+            try:
+                signature.append(os.stat(os.path.join(DATA_DIR, filename)).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+    
+    @classmethod
+    def get_mapping(cls):
+        """Mapa pool_id -> familia, reconstruido si los JSON de banners cambiaron"""
+        signature = cls._files_signature()
+        cached_signature, mapping = cls._state
+        if mapping is None or signature != cached_signature:
+            if mapping is not None:
+                # Los archivos cambiaron en disco: forzar su relectura
+                DataManager._weapon_banners = None
+                DataManager._promotional_banners = None
+            mapping = {}
+            # De menor a mayor prioridad, igual que el orden de búsqueda original
+            for pool_id in DataManager.load_promotional_banners():
+                mapping[pool_id] = BANNER_PROMOTIONAL
+            for pool_id in DataManager.load_weapon_banners():
+                mapping[pool_id] = BANNER_WEAPONS
+            mapping.update(SPECIAL_BANNERS)
+            cls._state = (signature, mapping)
+        return mapping
+    
+    @classmethod
+    def get_family(cls, pool_id):
+        """Familia de un banner; cualquier ID no reconocido es promocional"""
+        mapping = cls._state[1]
+        if mapping is None:
+            mapping = cls.get_mapping()
+        return mapping.get(pool_id, BANNER_PROMOTIONAL)
+    
+    @classmethod
+    def get_labels(cls, language=None):
+        """Nombres traducidos de cada familia en un idioma (por defecto, el actual)"""
+        language = language or DataManager._current_language
+        labels = cls._labels.get(language)
+        if labels is None:
+            labels = tuple(DataManager.translate(language, f"banners.{key}") for key in BANNER_FAMILY_KEYS)
+            cls._labels[language] = labels
+        return labels
+    
+    @classmethod
+    def invalidate(cls):
+        """Descarta el mapa y los nombres traducidos"""
+        cls._state = (None, None)
+        cls._labels = {}
+
+class ReferenceDataLoader:
+    """Carga en segundo plano y en paralelo de los datos de referencia
+    
+    Lee todos los JSON de data/ y la localización a la vez en un pool de
+    hilos. Cada archivo queda expuesto como un future en `futures`, y el
+    evento `ready` se activa cuando además las tablas de items y banners ya
+    están compiladas, de modo que la interfaz puede pintarse sin esperar.
+    """
+    SOURCES = (
+        ('dolls', DataManager.load_dolls),
+        ('weapons', DataManager.load_weapons),
+        ('mbox', DataManager.load_mbox),
+        ('weapon_banners', DataManager.load_weapon_banners),
+        ('promotional_banners', DataManager.load_promotional_banners),
+        ('banner_rules', DataManager.load_banner_rules),
+    )
+    
+    def __init__(self, language=None, max_workers=None):
+        self.ready = threading.Event()
+        self.error = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self.SOURCES) + 1,
+            thread_name_prefix="reference-data"
+        )
+        # Cualquier cambio a partir de aquí lo detecta DataManager.reload_changed
+        DataManager.snapshot_reference_data()
+        self.futures = {
+            'localization': self._executor.submit(LocalizationManager.set_language,
+                                                  language or DataManager._current_language)
+        }
+        for name, loader in self.SOURCES:
+            self.futures[name] = self._executor.submit(loader)
+        # Se envía la última: solo empieza cuando las lecturas ya tienen hilo
+        self._finish = self._executor.submit(self._build_tables)
+        self._executor.shutdown(wait=False)
+    
+    def _build_tables(self):
+        """Compila las tablas derivadas una vez leídos sus archivos"""
+        try:
+            wait(list(self.futures.values()))
+            ItemResolver.get_table()
+            BannerClassifier.get_mapping()
+        except Exception as e:
+            self.error = e
+            print(f"❌ Error preparando los datos de referencia: {e}")
+        finally:
+            self.ready.set()
+        
+        # Con la interfaz ya servida, se dejan listos los demás idiomas para cambiar al instante
+        try:
+            for language in DataManager.get_available_languages():
+                ItemResolver.get_table(language)
+                BannerClassifier.get_labels(language)
+        except Exception as e:
+            print(f"⚠️  No se pudieron preparar los demás idiomas: {e}")
+    
+    def wait(self, name=None, timeout=None):
+        """Espera a un archivo concreto (o a todo si no se indica) y devuelve su contenido"""
+        if name is None:
+            self.ready.wait(timeout)
+            return self.ready.is_set()
+        return self.futures[name].result(timeout)
+    
+    def is_ready(self):
+        return self.ready.is_set()
+
+def _reference_sources():
+    """Rutas (relativas a BASE_DIR) de todos los archivos que entran en el paquete"""
+    sources = [os.path.join('data', filename) for _name, filename, _numeric in REFERENCE_TABLES]
+    if os.path.isdir(LOCALIZATIONS_DIR):
+        for filename in sorted(os.listdir(LOCALIZATIONS_DIR)):
+            if filename.startswith('localization_') and filename.endswith('.json'):
+                sources.append(os.path.join('localizations', filename))
+    return sources
+
+def _source_signature(relative_path):
+    """(tamaño, fecha de modificación) de un archivo de origen, o None si no existe"""
+    try:
+        stat = os.stat(os.path.join(BASE_DIR, relative_path))
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+def _source_stamp(relative_path):
+    """(tamaño, SHA-256 del contenido) de un archivo de origen, o None si no existe"""
+    try:
+        with open(os.path.join(BASE_DIR, relative_path), 'rb') as f:
+            content = f.read()
+    except OSError:
+        return None
+    return (len(content), hashlib.sha256(content).hexdigest())
+
+def _source_changed(relative_path, stamp, bundle_mtime_ns):
+    """Si un archivo de origen ya no coincide con el sello guardado en el paquete
+    
+    Basta un stat: un tamaño distinto es un cambio, y un archivo que no se
+    modificó después de generar el paquete no cambió. Solo se lee y se hashea
+    si se modificó después (una edición, un checkout, una copia). Los que no
+    existen no cuentan como cambiados (distribuciones que solo incluyen el paquete).
+    """
+    try:
+        stat = os.stat(os.path.join(BASE_DIR, relative_path))
+    except OSError:
+        return False
+    if stat.st_size != stamp[0]:
+        return True
+    if stat.st_mtime_ns <= bundle_mtime_ns:
+        return False
+    return _source_stamp(relative_path) != tuple(stamp)
+
+def _read_reference_table(filename, numeric_keys):
+    """Lee una tabla de data/ directamente del JSON"""
+    with open(os.path.join(DATA_DIR, filename), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {int(k): v for k, v in data.items()} if numeric_keys else data
+
+def _intern_strings(value):
+    """Interna todas las cadenas para que las repetidas sean un único objeto"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {_intern_strings(k): _intern_strings(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_intern_strings(v) for v in value)
+    return value
+
+def build_reference_bundle(path=REFERENCE_BUNDLE_PATH):
+    """Genera el paquete precompilado con todas las tablas de data/ y las localizaciones
+    
+    Formato: BUNDLE_MAGIC + versión (2 bytes) + marshal con las tablas ya
+    indexadas por ID entero, las traducciones aplanadas (con el fallback
+    mezclado) y el sello (tamaño, hash) de cada archivo de origen. marshal
+    solo admite tipos básicos, así que leer el paquete nunca ejecuta código.
+    """
+    sources = _reference_sources()
+    # El sello se toma antes de leer: si un archivo cambia a medias, el paquete queda inválido
+    stamps = {relative: _source_stamp(relative) for relative in sources}
+    
+    tables = {name: _read_reference_table(filename, numeric_keys)
+              for name, filename, numeric_keys in REFERENCE_TABLES}
+    
+    localizations = {}
+    for relative in sources:
+        filename = os.path.basename(relative)
+        if relative.startswith('localizations'):
+            language = filename[len('localization_'):-len('.json')]
+            table = DataManager.compile_localization(language)
+            if table is not None:
+                localizations[language] = table
+    
+    bundle = _intern_strings({
+        'version': BUNDLE_VERSION,
+        'sources': stamps,
+        'tables': tables,
+        'localizations': localizations,
+    })
+    
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(BUNDLE_MAGIC + BUNDLE_VERSION.to_bytes(2, 'little'))
+        f.write(marshal.dumps(bundle))
+    os.replace(temp_path, path)
+    return bundle
+
+def read_reference_bundle(path=REFERENCE_BUNDLE_PATH):
+    """Lee el paquete precompilado; None si no existe, es de otra versión o algún origen cambió
+    
+    En el ejecutable los orígenes no se comprueban: el paquete se valida al
+    compilar con 'bundle --check'. Al ejecutar el código, ver _source_changed.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        bundle_mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, 'rb') as f:
+            header = f.read(len(BUNDLE_MAGIC) + 2)
+            if header[:len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+                print(f"⚠️  {os.path.basename(path)} no es un paquete de datos válido: usando los JSON")
+                return None
+            version = int.from_bytes(header[len(BUNDLE_MAGIC):], 'little')
+            if version != BUNDLE_VERSION:
+                print(f"⚠️  Paquete de datos de versión {version} (se esperaba {BUNDLE_VERSION}): usando los JSON")
+                return None
+            bundle = marshal.loads(f.read())
+    except Exception as e:
+        print(f"❌ Error cargando el paquete de datos: {e}")
+        return None
+    
+    if not getattr(sys, 'frozen', False):
+        for relative, stamp in bundle['sources'].items():
+            if stamp is not None and _source_changed(relative, stamp, bundle_mtime_ns):
+                print(f"⚠️  {relative} cambió desde que se generó el paquete: usando los JSON")
+                return None
+    
+    print(f"✅ Paquete de datos cargado: {len(bundle['tables'])} tablas, {len(bundle['localizations'])} idiomas")
+    return bundle
+
+def verify_reference_bundle(path=REFERENCE_BUNDLE_PATH):
+    """Compara el contenido del paquete con los JSON de origen; devuelve las tablas que difieren"""
+    bundle = read_reference_bundle(path)
+    if bundle is None:
+        return None
+    
+    mismatches = []
+    for name, filename, numeric_keys in REFERENCE_TABLES:
+        if bundle['tables'].get(name) != _read_reference_table(filename, numeric_keys):
+            mismatches.append(name)
+    for language, table in bundle['localizations'].items():
+        if table != DataManager.compile_localization(language):
+            mismatches.append(f"localization_{language}")
+    return mismatches
+
+# Tiradas por multi (10-pull)
+MULTI_SIZE = 10
+
+def _multi_key(record):
+    """Clave de agrupación de una tirada: mismo segundo y mismo banner"""
+    return (record['time'], record['pool_id'])
+
+class MultiIndex:
+    """Índice compacto de multis sobre los registros ordenados de más nuevo a más antiguo
+    
+    Un solo barrido lineal agrupa las tiradas por (time, pool_id). Cada grupo
+    se guarda como (inicio, longitud) en `run_starts`/`run_lengths`, y las multis
+    como trozos de MULTI_SIZE tiradas dentro de esos grupos en `starts`/`lengths`.
+    Así, tiradas de banners distintos en el mismo segundo no se mezclan, y
+    tiradas sueltas que caen en el mismo segundo no cuentan como multi.
+    """
+    
+    def __init__(self, records):
+        # El sort es estable: dentro de una multi se conserva el orden guardado
+        self.records = sorted(records, key=_multi_key, reverse=True)
+        self.run_starts = array('I')
+        self.run_lengths = array('I')
+        self.starts = array('I')
+        self.lengths = array('I')
+        
+        run_start = 0
+        previous_key = None
+        for position, record in enumerate(self.records):
+            key = _multi_key(record)
+            if key != previous_key:
+                if previous_key is not None:
+                    self._add_run(run_start, position - run_start)
+                run_start = position
+                previous_key = key
+        if self.records:
+            self._add_run(run_start, len(self.records) - run_start)
+    
+    def _add_run(self, start, length):
+        """Registra un grupo (time, pool_id) y las multis completas que contiene"""
+        self.run_starts.append(start)
+        self.run_lengths.append(length)
+        for offset in range(0, length - MULTI_SIZE + 1, MULTI_SIZE):
+            self.starts.append(start + offset)
+            self.lengths.append(MULTI_SIZE)
+    
+    def __len__(self):
+        """Número de multis detectadas"""
+        return len(self.starts)
+    
+    def __iter__(self):
+        """Itera las multis como (inicio, longitud)"""
+        return zip(self.starts, self.lengths)
+    
+    def runs(self):
+        """Itera los grupos (time, pool_id) como (inicio, longitud)"""
+        return zip(self.run_starts, self.run_lengths)
+    
+    def with_newer(self, newer):
+        """Índice con las tiradas de otro índice, todas más nuevas, delante de las actuales
+        
+        No se reordena nada: solo se desplazan los inicios de grupos y multis
+        existentes. Devuelve un índice nuevo; el actual sigue siendo válido.
+        """
+        shift = len(newer.records)
+        combined = MultiIndex.__new__(MultiIndex)
+        combined.records = newer.records + self.records
+        combined.run_starts = newer.run_starts + array('I', [start + shift for start in self.run_starts])
+        combined.run_lengths = newer.run_lengths + self.run_lengths
+        combined.starts = newer.starts + array('I', [start + shift for start in self.starts])
+        combined.lengths = newer.lengths + self.lengths
+        return combined
+    
+    def multi_of(self, position):
+        """Número de multi que contiene la posición dada, o -1 si es una tirada suelta"""
+        i = bisect_right(self.starts, position) - 1
+        if i >= 0 and position < self.starts[i] + self.lengths[i]:
+            return i
+        return -1
+
+def _write_json_atomic(path, data, indent=None):
+    """Escribe un JSON en un archivo temporal y lo reemplaza de una sola vez"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+class StatsCache:
+    """Caché en disco de los resultados derivados del backup
+    
+    Cada entrada guarda el hash SHA-256 del backup.json del que se calculó
+    junto con la huella de los datos de referencia; si cualquiera de los dos
+    cambia, la clave deja de coincidir y la caché se ignora.
+    """
+    CACHE_VERSION = 5
+    
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+    
+    def load(self, cache_key):
+        """Devuelve los resultados guardados si corresponden a esa clave, o None"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if cached.get('version') != self.CACHE_VERSION or cached.get('cache_key') != cache_key:
+            return None
+        return self._decode(cached['derived'])
+    
+    def save(self, cache_key, derived):
+        """Guarda los resultados derivados de forma atómica"""
+        try:
+            _write_json_atomic(self.cache_file, {
+                'version': self.CACHE_VERSION,
+                'cache_key': cache_key,
+                'derived': derived
+            })
+            return True
+        except Exception as e:
+            print(f"❌ Error guardando caché de estadísticas: {e}")
+            return False
+    
+    @staticmethod
+    def _decode(derived):
+        """JSON convierte las claves enteras en texto; aquí se restauran"""
+        derived['stats']['banners'] = {int(k): v for k, v in derived['stats']['banners'].items()}
+        derived['rollups']['rarities'] = {int(k): v for k, v in derived['rollups']['rarities'].items()}
+        derived['banner_families'] = {int(k): v for k, v in derived['banner_families'].items()}
+        return derived
+
 class SimpleGachaBackup:
     def __init__(self):
         self.backup_file = os.path.join(BASE_DIR, "backup.json")
         self.data_manager = DataManager()
+        self.stats_cache = StatsCache(os.path.join(BASE_DIR, "backup.cache.json"))
+        self._multi_index = None
+        self._multi_index_key = None
+        self._content_hash = None
+        self._content_hash_key = None
+        self._derived = None
         self.init_backup()
     
     def init_backup(self):
@@ -305,115 +1047,356 @@ class SimpleGachaBackup:
             print(f"❌ Error cargando backup: {e}")
             return self.init_backup()
     
-    def save_backup(self, data):
-        """Guarda el backup"""
+    def save_backup(self, data, newer_records=None):
+        """Guarda el backup
+        
+        `newer_records` son tiradas recién agregadas, todas más nuevas que el
+        resto: con ellas los sketches guardados se extienden en vez de rehacerse.
+        """
+        from fleet_stats import advance_store_sketches, build_store_sketches
+        
         try:
             data["last_updated"] = datetime.now().isoformat()
-            with open(self.backup_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Cada backup lleva sus propios sketches para el reporte combinado
+            sketches = None
+            if newer_records is not None:
+                sketches = advance_store_sketches(data.get("sketches"), newer_records, len(data["records"]))
+            data["sketches"] = sketches or build_store_sketches(data["records"])
+            _write_json_atomic(self.backup_file, data, indent=2)
+            # Los resultados derivados en memoria ya no corresponden al archivo
+            self._derived = None
             return True
         except Exception as e:
             print(f"❌ Error guardando backup: {e}")
             return False
     
     def add_new_records(self, new_records):
-        """Agrega SOLO registros NUEVOS comparando con el backup existente"""
+        """Agrega SOLO registros NUEVOS comparando con el backup existente
+        
+        Devuelve la lista de tiradas agregadas (vacía si no había nada nuevo).
+        """
         backup_data = self.load_backup()
         existing_records = backup_data["records"]
         
         print(f"   🔍 Comparando {len(new_records)} registros nuevos vs {len(existing_records)} existentes...")
         
-        # Para el backup existente, crear un mapa de "grupos de multi"
-        existing_groups = self.group_by_multi(existing_records)
-        
-        # Para los nuevos registros, también agrupar por multi
-        new_groups = self.group_by_multi(new_records)
+        existing_index = self.get_multi_index(existing_records)
+        new_index = MultiIndex(new_records)
+        existing_runs = list(existing_index.runs())
         
-        # Combinar: para cada grupo de multi, agregar solo lo que no existe
+        # Combinar: ambos índices están ordenados igual, así que basta un barrido en paralelo
         combined_records = existing_records.copy()
-        added_count = 0
-        
-        for timestamp, new_multi_group in new_groups.items():
-            if timestamp not in existing_groups:
-                # Multi completamente nueva - agregar todo
-                combined_records.extend(new_multi_group)
-                added_count += len(new_multi_group)
-                print(f"      ✅ Multi nueva: {datetime.fromtimestamp(timestamp).strftime('%H:%M')} - {len(new_multi_group)} tiradas")
+        added_records = []
+        existing_pos = 0
+        
+        for start, length in new_index.runs():
+            new_group = new_index.records[start:start + length]
+            key = _multi_key(new_group[0])
+            
+            # Avanzar en el backup hasta el grupo (time, pool_id) correspondiente
+            while (existing_pos < len(existing_runs) and
+                   _multi_key(existing_index.records[existing_runs[existing_pos][0]]) > key):
+                existing_pos += 1
+            
+            existing_group = []
+            if existing_pos < len(existing_runs):
+                existing_start, existing_length = existing_runs[existing_pos]
+                if _multi_key(existing_index.records[existing_start]) == key:
+                    existing_group = existing_index.records[existing_start:existing_start + existing_length]
+            
+            if not existing_group:
+                # Grupo completamente nuevo - agregar todo
+                combined_records.extend(new_group)
+                added_records.extend(new_group)
+                print(f"      ✅ Multi nueva: {datetime.fromtimestamp(key[0]).strftime('%H:%M')} - {len(new_group)} tiradas")
             else:
-                # Multi existente - verificar item por item
-                existing_multi_group = existing_groups[timestamp]
-                existing_items = {(r['item'], r['pool_id']) for r in existing_multi_group}
-                
+                # Grupo existente - agregar solo las copias de cada item que falten
+                existing_items = Counter(r['item'] for r in existing_group)
                 new_items_to_add = []
-                for new_record in new_multi_group:
-                    item_key = (new_record['item'], new_record['pool_id'])
-                    if item_key not in existing_items:
+                for new_record in new_group:
+                    if existing_items[new_record['item']] > 0:
+                        existing_items[new_record['item']] -= 1
+                    else:
                         new_items_to_add.append(new_record)
                 
                 if new_items_to_add:
                     combined_records.extend(new_items_to_add)
-                    added_count += len(new_items_to_add)
-                    print(f"      ➕ Multi existente: {datetime.fromtimestamp(timestamp).strftime('%H:%M')} - {len(new_items_to_add)} items nuevos")
+                    added_records.extend(new_items_to_add)
+                    print(f"      ➕ Multi existente: {datetime.fromtimestamp(key[0]).strftime('%H:%M')} - {len(new_items_to_add)} items nuevos")
         
         # Actualizar backup solo si hay cambios
-        if added_count > 0:
+        if added_records:
+            previous_derived = self._derived
             backup_data["records"] = combined_records
-            self.save_backup(backup_data)
+            newer = MultiIndex(added_records)
+            # En una importación normal todas las tiradas agregadas son más nuevas que las del backup
+            all_newer = (not existing_index.records or
+                         _multi_key(newer.records[-1]) > _multi_key(existing_index.records[0]))
+            if self.save_backup(backup_data, added_records if all_newer else None) and all_newer:
+                self._apply_added_records(existing_index, previous_derived, newer, backup_data)
+        
+        return added_records
+    
+    def _apply_added_records(self, previous_index, previous_derived, newer, backup_data):
+        """Lleva el índice de multis y lo derivado en memoria al backup recién guardado
+        
+        Solo se usa cuando todas las tiradas agregadas (`newer`) son más nuevas
+        que las del backup: entonces basta con ponerlas delante y sumarlas a
+        los totales, sin releer ni reordenar el historial. En cualquier otro
+        caso todo se recalcula la próxima vez que se pida.
+        """
+        index = previous_index.with_newer(newer)
+        self._multi_index = index
+        self._multi_index_key = self._backup_file_key()
+        
+        content_hash = self.get_content_hash()
+        fingerprint = DataManager.get_data_fingerprint()
+        # Lo derivado anterior solo sirve si se calculó con los mismos datos de referencia
+        if (content_hash is None or previous_derived is None or previous_derived[0] is None
+                or not previous_derived[0].endswith(f":{fingerprint}")):
+            return
+        cache_key = f"{content_hash}:{fingerprint}"
+        
+        derived = self._derive_with_newer(previous_derived[1], index, newer.records, backup_data)
+        self.stats_cache.save(cache_key, derived)
+        self._derived = (cache_key, derived)
+    
+    def _derive_with_newer(self, previous, index, newer_records, backup_data):
+        """Resultados derivados de `previous` más unas tiradas más nuevas (objetos nuevos)"""
+        from pull_planner import RULE_SETS, advance_pity
         
-        return added_count
+        stats = dict(previous['stats'])
+        stats['banners'] = dict(stats['banners'])
+        rarities = dict(previous['rollups']['rarities'])
+        types = dict(previous['rollups']['types'])
+        _count_records(newer_records, stats['banners'], rarities, types)
+        
+        records = index.records
+        stats['total_records'] = len(records)
+        stats['multi_count'] = len(index)
+        stats['oldest'] = datetime.fromtimestamp(records[-1]['time']).strftime("%Y-%m-%d")
+        stats['newest'] = datetime.fromtimestamp(records[0]['time']).strftime("%Y-%m-%d")
+        stats['last_update'] = datetime.fromisoformat(backup_data["last_updated"]).strftime("%Y-%m-%d %H:%M")
+        
+        return {
+            'stats': stats,
+            'rollups': {'rarities': rarities, 'types': types},
+            'pity': {rule: advance_pity(previous['pity'].get(rule, 0), newer_records, rule) for rule in RULE_SETS},
+            'banner_families': group_by_banner_family(stats['banners'])
+        }
+    
+    def _backup_file_key(self):
+        """Identifica la versión del archivo de backup en disco (mtime, tamaño)"""
+        try:
+            file_stat = os.stat(self.backup_file)
+            return (file_stat.st_mtime_ns, file_stat.st_size)
+        except OSError:
+            return None
     
-    def group_by_multi(self, records):
-        """Agrupa registros por timestamp (cada grupo es una multi)"""
-        groups = {}
-        for record in records:
-            timestamp = record['time']
-            if timestamp not in groups:
-                groups[timestamp] = []
-            groups[timestamp].append(record)
-        return groups
+    def get_multi_index(self, records=None):
+        """Índice de multis del backup, cacheado mientras el archivo no cambie"""
+        key = self._backup_file_key()
+        if self._multi_index is None or key is None or key != self._multi_index_key:
+            if records is None:
+                records = self.get_all_records()
+            self._multi_index = MultiIndex(records)
+            self._multi_index_key = key
+        return self._multi_index
     
     def get_all_records(self):
         """Obtiene todos los registros del backup"""
         backup_data = self.load_backup()
         return backup_data["records"]
     
-    def get_statistics(self):
-        """Estadísticas del backup"""
-        records = self.get_all_records()
+    def get_content_hash(self):
+        """Hash SHA-256 del backup.json, recalculado solo si el archivo cambia"""
+        key = self._backup_file_key()
+        if self._content_hash is None or key is None or key != self._content_hash_key:
+            hasher = hashlib.sha256()
+            try:
+                with open(self.backup_file, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        hasher.update(chunk)
+            except OSError:
+                return None
+            self._content_hash = hasher.hexdigest()
+            self._content_hash_key = key
+        return self._content_hash
+    
+    def get_derived(self):
+        """Resultados derivados (estadísticas, pity, totales), desde memoria, disco o recalculados"""
+        content_hash = self.get_content_hash()
+        # Rarezas y familias de banner salen de data/: si cambian, lo derivado también
+        cache_key = f"{content_hash}:{DataManager.get_data_fingerprint()}" if content_hash else None
+        if self._derived is not None and self._derived[0] == cache_key:
+            return self._derived[1]
+        
+        derived = self.stats_cache.load(cache_key) if cache_key else None
+        if derived is None:
+            derived = self.compute_derived()
+            if cache_key:
+                self.stats_cache.save(cache_key, derived)
+        
+        self._derived = (cache_key, derived)
+        return derived
+    
+    def compute_derived(self):
+        """Calcula todos los resultados derivados a partir de los registros"""
+        from pull_planner import RULE_SETS, get_current_pity
+        
+        backup_data = self.load_backup()
+        index = self.get_multi_index(backup_data["records"])
+        records = index.records
         stats = {
             'total_records': len(records),
             'banners': {},
             'last_update': None,
-            'multi_count': 0
+            'multi_count': len(index)
         }
+        rarities = {}
+        types = {}
         
         if records:
-            # Agrupar por timestamp para detectar multis
-            timestamp_groups = {}
-            for record in records:
-                timestamp = record['time']
-                if timestamp not in timestamp_groups:
-                    timestamp_groups[timestamp] = []
-                timestamp_groups[timestamp].append(record)
-            
-            # Contar multis (grupos con más de 1 registro)
-            stats['multi_count'] = sum(1 for group in timestamp_groups.values() if len(group) > 1)
-            
-            # Ordenar por tiempo
-            sorted_records = sorted(records, key=lambda x: x['time'])
-            stats['oldest'] = datetime.fromtimestamp(sorted_records[0]['time']).strftime("%Y-%m-%d")
-            stats['newest'] = datetime.fromtimestamp(sorted_records[-1]['time']).strftime("%Y-%m-%d")
-            stats['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+            # El índice ya está ordenado de más nuevo a más antiguo
+            stats['oldest'] = datetime.fromtimestamp(records[-1]['time']).strftime("%Y-%m-%d")
+            stats['newest'] = datetime.fromtimestamp(records[0]['time']).strftime("%Y-%m-%d")
+            if backup_data.get("last_updated"):
+                stats['last_update'] = datetime.fromisoformat(backup_data["last_updated"]).strftime("%Y-%m-%d %H:%M")
             
-            # Contar por banner
-            for record in records:
-                banner_id = record['pool_id']
-                stats['banners'][banner_id] = stats['banners'].get(banner_id, 0) + 1
+            _count_records(records, stats['banners'], rarities, types)
         
-        return stats
+        return {
+            'stats': stats,
+            'rollups': {'rarities': rarities, 'types': types},
+            'pity': {rule: get_current_pity(records, rule) for rule in RULE_SETS},
+            'banner_families': group_by_banner_family(stats['banners'])
+        }
+    
+    def get_statistics(self):
+        """Estadísticas del backup"""
+        return self.get_derived()['stats']
+    
+    def get_banner_groups(self):
+        """Tiradas agrupadas por nombre de banner en el idioma actual"""
+        labels = BannerClassifier.get_labels()
+        return {labels[family]: count for family, count in self.get_derived()['banner_families'].items()}
+
+class ImportProgress:
+    """Progreso de una importación: páginas y tiradas por type_id, páginas/s y ETA
+    
+    El total de páginas esperado de cada type_id sale de la importación
+    anterior del mismo servidor (guardada en cache/import_pages.json),
+    acotado por el límite de páginas configurado; si no hay historial ni
+    límite, el total es desconocido (None) y no hay ETA. La velocidad es la
+    de las últimas páginas, no la media de toda la importación, para que un
+    servidor que se vuelve lento se note enseguida.
+    
+    Cada cambio se envía a `listener(evento)` desde el hilo que importa.
+    """
+    HISTORY_FILE = os.path.join(CACHE_DIR, 'import_pages.json')
+    RATE_WINDOW = 5  # Páginas usadas para calcular la velocidad actual
+    
+    def __init__(self, type_ids, server_code="darkwinter", page_limit=None, listener=None):
+        self.server_code = server_code
+        self.page_limit = ConfigManager.get_setting('page_limit', 50) if page_limit is None else page_limit
+        self.listener = listener
+        previous = self.load_history().get(server_code, {})
+        self.types = {}
+        for type_id in type_ids:
+            self.types[type_id] = {
+                'type_id': type_id,
+                'family': IMPORT_TYPE_IDS.get(type_id, BANNER_PROMOTIONAL),
+                'pages': 0,
+                'pulls': 0,
+                'expected_pages': self._expected_pages(previous.get(type_id)),
+                'pages_per_second': None,
+                'eta': None,
+                'finished': False
+            }
+        self._page_times = {type_id: deque(maxlen=self.RATE_WINDOW + 1) for type_id in type_ids}
+    
+    @classmethod
+    def load_history(cls):
+        """{servidor: {type_id: páginas}} de importaciones anteriores"""
+        try:
+            with open(cls.HISTORY_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _expected_pages(self, previous_pages):
+        if self.page_limit == -1:
+            return previous_pages
+        if previous_pages is None:
+            return self.page_limit
+        return min(previous_pages, self.page_limit)
+    
+    def start_type(self, type_id):
+        self._page_times[type_id].append(time.monotonic())
+        self._notify(type_id)
+    
+    def page_done(self, type_id, pulls):
+        """Registra una página recibida con `pulls` tiradas"""
+        progress = self.types[type_id]
+        times = self._page_times[type_id]
+        times.append(time.monotonic())
+        progress['pages'] += 1
+        progress['pulls'] += pulls
+        
+        # Hay más páginas que la última vez: se espera al menos una más
+        expected = progress['expected_pages']
+        if expected is not None and progress['pages'] >= expected:
+            limit_reached = self.page_limit != -1 and progress['pages'] >= self.page_limit
+            progress['expected_pages'] = progress['pages'] if limit_reached else progress['pages'] + 1
+        
+        elapsed = times[-1] - times[0]
+        if elapsed > 0:
+            progress['pages_per_second'] = (len(times) - 1) / elapsed
+            if progress['expected_pages'] is not None:
+                remaining = progress['expected_pages'] - progress['pages']
+                progress['eta'] = remaining / progress['pages_per_second']
+        self._notify(type_id)
+    
+    def finish_type(self, type_id):
+        progress = self.types[type_id]
+        progress['finished'] = True
+        progress['expected_pages'] = progress['pages']
+        progress['eta'] = 0
+        self._notify(type_id)
+    
+    def save_history(self):
+        """Guarda las páginas de los type_id terminados para estimar la próxima vez"""
+        history = self.load_history()
+        server_history = history.setdefault(self.server_code, {})
+        for type_id, progress in self.types.items():
+            if progress['finished'] and progress['pages']:
+                server_history[type_id] = progress['pages']
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _write_json_atomic(self.HISTORY_FILE, history)
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar el historial de páginas: {e}")
+    
+    def _notify(self, type_id):
+        if self.listener:
+            self.listener(dict(self.types[type_id]))
+
+def _count_records(records, banners, rarities, types):
+    """Suma las tiradas a los conteos por banner, rareza y tipo"""
+    for record in records:
+        banner_id = record['pool_id']
+        banners[banner_id] = banners.get(banner_id, 0) + 1
+        _, rarity = get_item_name(record['item'])
+        rarities[rarity] = rarities.get(rarity, 0) + 1
+        item_type = get_item_type(record['item'])
+        types[item_type] = types.get(item_type, 0) + 1
 
-def get_all_pages_for_type(token, email, type_id, server_code="darkwinter", progress_callback=None):
-    """Obtiene TODAS las páginas para un type_id específico - CON LÍMITE CONFIGURABLE"""
+def get_all_pages_for_type(token, email, type_id, server_code="darkwinter", progress_callback=None, progress=None):
+    """Obtiene TODAS las páginas para un type_id específico - CON LÍMITE CONFIGURABLE
+    
+    `progress_callback` recibe líneas de texto para el log; `progress` es un
+    ImportProgress opcional que recibe cada página como evento.
+    """
     all_records = []
     next_cursor = None
     page_count = 0
@@ -437,6 +1420,9 @@ def get_all_pages_for_type(token, email, type_id, server_code="darkwinter", prog
     
     print(f"   🌐 Servidor: {server_config['name']}")
     
+    if progress:
+        progress.start_type(type_id)
+    
     while True:
         page_count += 1
         retry_count = 0
@@ -489,6 +1475,8 @@ def get_all_pages_for_type(token, email, type_id, server_code="darkwinter", prog
                         # Callback de progreso si está disponible
                         if progress_callback:
                             progress_callback(f"Página {page_count}: {len(records)} tiradas")
+                        if progress:
+                            progress.page_done(type_id, len(records))
                         
                         # AGREGAR TODOS LOS REGISTROS SIN PROCESAR
                         all_records.extend(records)
@@ -555,87 +1543,35 @@ def get_all_pages_for_type(token, email, type_id, server_code="darkwinter", prog
             break
     
     print(f"      📊 Total type_id {type_id}: {len(all_records)} tiradas en {page_count} páginas")
+    if progress and success:
+        progress.finish_type(type_id)
     return all_records
 
 def get_banner_name(pool_id):
-    """Nombres de banners - VERSIÓN MEJORADA CON LOCALIZACIÓN"""
-    data_manager = DataManager()
-    
-    # 1. Banners especiales que tienen IDs específicos FIJOS - USANDO LOCALIZACIÓN
-    special_banners = {
-        130002: _("banners.weapons"), 
-        130003: _("banners.characters"),
-        130004: _("banners.special"), 
-        130005: _("banners.beginner"),
-        130008: _("banners.event"),
-        1001: _("banners.permanent"),
-        99001: _("banners.mystery_box")
-    }
-    
-    # Si es un banner especial fijo, devolver su nombre TRADUCIDO
-    if pool_id in special_banners:
-        return special_banners[pool_id]
-    
-    # 2. Verificar en banners de armas (IDs variables)
-    weapon_banners = data_manager.load_weapon_banners()
-    if pool_id in weapon_banners:
-        return _("banners.weapons")  # Siempre "Armas" o "Weapons"
-    
-    # 3. Verificar en banners promocionales de personajes (IDs variables)
-    promotional_banners = data_manager.load_promotional_banners()
-    if pool_id in promotional_banners:
-        return _("banners.promotional")  # Siempre "Promocional" o "Promotional"
-    
-    # 4. Cualquier otro ID no reconocido es "Promocional" por defecto
-    return _("banners.promotional")
+    """Nombre traducido de la familia del banner"""
+    return BannerClassifier.get_labels()[BannerClassifier.get_family(pool_id)]
+
+def group_by_banner_family(banner_counts):
+    """Suma las tiradas por pool_id bajo su código de familia de banner"""
+    families = {}
+    for banner_id, count in banner_counts.items():
+        family = BannerClassifier.get_family(banner_id)
+        families[family] = families.get(family, 0) + count
+    return families
+
+def group_by_banner_name(banner_counts):
+    """Suma las tiradas por pool_id bajo su nombre de banner traducido"""
+    labels = BannerClassifier.get_labels()
+    return {labels[family]: count for family, count in group_by_banner_family(banner_counts).items()}
 
 def get_item_name(item_id):
-    """Nombres de items usando los diccionarios desde archivos JSON"""
-    data_manager = DataManager()
-    dolls = data_manager.load_dolls()
-    weapons = data_manager.load_weapons()
-    mbox = data_manager.load_mbox()
-    
-    # Primero buscar en personajes (DOLLS)
-    if item_id in dolls:
-        name_key = dolls[item_id]["name_key"]
-        rarity = dolls[item_id]["rarity"]
-        # Usar el sistema de localización mejorado
-        item_name = DataManager.get_text(name_key, f"Personaje {item_id}")
-        return item_name, rarity
-    
-    # Luego buscar en armas (WEAPONS)
-    if item_id in weapons:
-        name_key = weapons[item_id]["name_key"]
-        rarity = weapons[item_id]["rarity"]
-        item_name = DataManager.get_text(name_key, f"Arma {item_id}")
-        return item_name, rarity
-    
-    # Buscar en mbox
-    if item_id in mbox:
-        name_key = mbox[item_id]["name_key"]
-        rarity = mbox[item_id]["rarity"]
-        item_name = DataManager.get_text(name_key, f"Mbox {item_id}")
-        return item_name, rarity
-    
-    # Si no se encuentra en ningún diccionario
-    return f"Item {item_id}", 3
+    """Nombre traducido y rareza de un item"""
+    item_name, rarity, _type_code = ItemResolver.resolve(item_id)
+    return item_name, rarity
 
 def get_item_type(item_id):
     """Determina el tipo de item (character, weapon, mbox, other)"""
-    data_manager = DataManager()
-    dolls = data_manager.load_dolls()
-    weapons = data_manager.load_weapons()
-    mbox = data_manager.load_mbox()
-    
-    if item_id in dolls:
-        return "character"
-    elif item_id in weapons:
-        return "weapon"
-    elif item_id in mbox:
-        return "mbox"
-    else:
-        return "other"
+    return ITEM_TYPE_NAMES[ItemResolver.resolve(item_id)[2]]
 
 def get_server_display_name(server_code):
     """Obtiene el nombre para mostrar del servidor"""
@@ -692,12 +1628,12 @@ def get_complete_gacha_history_simple_backup():
     print(f"\n📦 Obteniendo datos del servidor...")
     
     # Obtener datos CRUDOS
-    type_ids_to_check = ['1', '3', '4', '5', '8']
+    progress = ImportProgress(IMPORT_TYPE_IDS, server_code)
     all_new_raw_records = []
     
-    for type_id in type_ids_to_check:
+    for type_id in IMPORT_TYPE_IDS:
         print(f"\n🎯 Type_id {type_id}:")
-        records = get_all_pages_for_type(token, email, type_id, server_code)
+        records = get_all_pages_for_type(token, email, type_id, server_code, progress=progress)
         if records:
             # Verificar duplicados en esta request (solo para info)
             unique_timestamps = len({r['time'] for r in records})
@@ -708,10 +1644,11 @@ def get_complete_gacha_history_simple_backup():
             print(f"   📥 {len(records)} tiradas obtenidas")
         else:
             print(f"   ℹ️  Sin datos")
+    progress.save_history()
     
     # 🔥 COMPARAR Y AGREGAR SOLO LO NUEVO
     if all_new_raw_records:
-        added_count = backup.add_new_records(all_new_raw_records)
+        added_count = len(backup.add_new_records(all_new_raw_records))
         
         print(f"\n{'='*50}")
         print("📊 RESULTADO DE LA ACTUALIZACIÓN:")
@@ -734,23 +1671,22 @@ def get_complete_gacha_history_simple_backup():
         
         # Mostrar últimas tiradas
         if new_stats['total_records'] > 0:
-            all_records = backup.get_all_records()
-            recent_records = sorted(all_records, key=lambda x: x['time'], reverse=True)[:15]
+            index = backup.get_multi_index()
+            recent_records = index.records[:15]
             
             print(f"\n📜 ÚLTIMAS TIRADAS:")
             current_time_group = None
-            for i, pull in enumerate(recent_records, 1):
+            for i, pull in enumerate(recent_records):
                 time_str = datetime.fromtimestamp(pull['time']).strftime("%Y-%m-%d %H:%M")
                 banner_name = get_banner_name(pull['pool_id'])
                 item_name, rarity = get_item_name(pull['item'])
                 
                 # Agrupar por multi visualmente
-                if current_time_group != pull['time']:
+                if current_time_group != _multi_key(pull):
                     if current_time_group is not None:
                         print("   ──────────────────────")
-                    current_time_group = pull['time']
-                    multi_count = len([r for r in recent_records if r['time'] == pull['time']])
-                    multi_indicator = " 🎯" if multi_count > 1 else ""
+                    current_time_group = _multi_key(pull)
+                    multi_indicator = " 🎯" if index.multi_of(i) >= 0 else ""
                     print(f"   {time_str}{multi_indicator}")
                 
                 print(f"        {banner_name} → {item_name}")
@@ -762,5 +1698,152 @@ def get_complete_gacha_history_simple_backup():
     print(f"\n{'='*60}")
     input("🎉 Presiona ENTER para cerrar...")
 
+def run_plan_command(args):
+    """Subcomando 'plan': distribución exacta de tiradas para N copias promocionales"""
+    from pull_planner import get_planner, get_current_pity
+    
+    planner = get_planner(args.banner)
+    
+    # Si no se indica el pity, se calcula desde el backup
+    pity = args.pity
+    if pity is None:
+        backup = SimpleGachaBackup()
+        pity = get_current_pity(backup.get_all_records(), args.banner)
+    
+    summary = planner.plan(copies=args.copies, pity=pity,
+                           guaranteed=args.guaranteed, budget=args.budget)
+    
+    print(f"🎯 Banner: {args.banner} | Copias: {args.copies} | Pity: {pity} | Garantizado: {'sí' if args.guaranteed else 'no'}")
+    print(f"   Tiradas esperadas: {summary['expected']:.1f} (±{summary['std_dev']:.1f})")
+    for percentile, pulls in summary['percentiles'].items():
+        print(f"   {int(percentile * 100)}%: {pulls} tiradas o menos")
+    print(f"   Peor caso: {summary['worst_case']} tiradas")
+    if args.budget is not None:
+        print(f"   Probabilidad con {args.budget} tiradas: {summary['success_probability'] * 100:.2f}%")
+
+def run_aggregate_command(args):
+    """Subcomando 'aggregate': estadísticas combinadas de un directorio de backups"""
+    from fleet_stats import aggregate_directory, load_store_sketches
+    
+    # El reporte puede guardarse dentro del mismo directorio: no es un backup
+    exclude = [args.json] if args.json else []
+    aggregate = aggregate_directory(args.directory, args.workers, exclude)
+    report = aggregate.to_report()
+    
+    print(f"📊 REPORTE COMBINADO: {report['accounts']} cuentas")
+    print(f"   Total de tiradas: {report['total_pulls']}")
+    print(f"   Multis detectadas: {report['multi_count']}")
+    
+    if report['rarity_rates']:
+        print("\n⭐ RAREZAS:")
+        for rarity, rate in report['rarity_rates'].items():
+            print(f"   {'★' * rarity}: {report['rarity_counts'][rarity]} ({rate * 100:.2f}%)")
+    
+    if report['banner_groups']:
+        print("\n🎯 DISTRIBUCIÓN:")
+        for banner_name, count in report['banner_groups'].items():
+            print(f"   {banner_name}: {count} tiradas")
+    
+    print("\n🎲 PITY POR 5★:")
+    for rule, summary in report['pity'].items():
+        if summary['count']:
+            print(f"   {rule}: {summary['count']} 5★, media {summary['mean']:.1f}, mediana {summary['median']}")
+        else:
+            print(f"   {rule}: sin datos")
+    
+    print("\n📈 PERCENTILES (p10 / p50 / p90 / p99):")
+    for metric, quantiles in report['quantiles'].items():
+        values = " / ".join("-" if v is None else f"{v:g}" for v in quantiles.values())
+        print(f"   {metric}: {values}")
+    
+    if args.account:
+        with open(args.account, 'r', encoding='utf-8') as f:
+            account_sketches = load_store_sketches(json.load(f))
+        print(f"\n👤 CUENTA {args.account}:")
+        for metric, result in aggregate.account_percentiles(account_sketches).items():
+            if result['percentile'] is None:
+                print(f"   {metric}: sin datos")
+            else:
+                print(f"   {metric}: mediana {result['median']:g} → percentil {result['percentile']:.0f}")
+    
+    for path, error in report['failed']:
+        print(f"   ⚠️  Omitido {path}: {error}")
+    
+    if args.json:
+        _write_json_atomic(args.json, report, indent=2)
+        print(f"\n💾 Reporte guardado: {os.path.abspath(args.json)}")
+
+def run_bundle_command(args):
+    """Subcomando 'bundle': genera o comprueba el paquete precompilado de datos"""
+    if args.check:
+        mismatches = verify_reference_bundle(args.output)
+        if mismatches is None:
+            print(f"❌ No hay un paquete válido en {args.output}")
+            sys.exit(1)
+        if mismatches:
+            print(f"❌ El paquete no coincide con los JSON en: {', '.join(mismatches)}")
+            sys.exit(1)
+        print("✅ El paquete coincide con los JSON de origen")
+        return
+    
+    try:
+        bundle = build_reference_bundle(args.output)
+    except Exception as e:
+        print(f"❌ Error generando el paquete de datos: {e}")
+        sys.exit(1)
+    tables = ", ".join(f"{name} ({len(table)})" for name, table in bundle['tables'].items())
+    print(f"📦 Paquete generado: {os.path.abspath(args.output)} ({os.path.getsize(args.output)} bytes)")
+    print(f"   Tablas: {tables}")
+    print(f"   Idiomas: {', '.join(sorted(bundle['localizations']))}")
+
+def _positive_int(value):
+    """Tipo de argparse: entero mayor que 0"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"debe ser un número positivo: {value}")
+    return number
+
+def _non_negative_int(value):
+    """Tipo de argparse: entero mayor o igual que 0"""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"no puede ser negativo: {value}")
+    return number
+
+def run_cli(argv):
+    """Subcomandos de línea de comandos (sin argumentos se usa el modo interactivo)"""
+    from pull_planner import RULE_SETS
+    
+    parser = argparse.ArgumentParser(prog="gacha_api.py", description="Vertebrae - herramientas de línea de comandos")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    plan_parser = subparsers.add_parser("plan", help="Distribución exacta de tiradas para N copias")
+    plan_parser.add_argument("--banner", choices=RULE_SETS, default="characters")
+    plan_parser.add_argument("--copies", type=_positive_int, default=1)
+    plan_parser.add_argument("--pity", type=_non_negative_int, default=None, help="Por defecto se calcula desde backup.json")
+    plan_parser.add_argument("--guaranteed", action="store_true", help="El próximo 5★ es el promocional")
+    plan_parser.add_argument("--budget", type=_non_negative_int, default=None, help="Tiradas disponibles")
+    plan_parser.set_defaults(handler=run_plan_command)
+    
+    aggregate_parser = subparsers.add_parser("aggregate", help="Estadísticas combinadas de muchos backups")
+    aggregate_parser.add_argument("directory", help="Directorio con archivos backup.json (se busca recursivamente)")
+    aggregate_parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    aggregate_parser.add_argument("--json", default=None, help="Guardar el reporte completo en este archivo")
+    aggregate_parser.add_argument("--account", default=None, help="Backup de una cuenta para ubicarla en los percentiles")
+    aggregate_parser.set_defaults(handler=run_aggregate_command)
+    
+    bundle_parser = subparsers.add_parser("bundle", help="Genera el paquete precompilado de datos de referencia")
+    bundle_parser.add_argument("--output", default=REFERENCE_BUNDLE_PATH, help="Ruta del paquete")
+    bundle_parser.add_argument("--check", action="store_true", help="Solo comprobar el paquete existente contra los JSON")
+    bundle_parser.set_defaults(handler=run_bundle_command)
+    
+    args = parser.parse_args(argv)
+    args.handler(args)
+
 if __name__ == "__main__":
-    get_complete_gacha_history_simple_backup()
\ No newline at end of file
+    # Necesario para los procesos de 'aggregate' en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        run_cli(sys.argv[1:])
+    else:
+        get_complete_gacha_history_simple_backup()
\ No newline at end of file
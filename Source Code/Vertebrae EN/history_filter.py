@@ -0,0 +1,311 @@
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from gacha_api import ItemResolver, BANNER_PROMOTIONAL
+from name_search import get_name_index
+
+# Records checked between two looks at the cancellation flag
+CANCEL_CHECK_EVERY = 4096
+
+# History columns that can be sorted, in Treeview order
+SORT_DATE, SORT_TIME, SORT_BANNER, SORT_ITEM, SORT_TYPE, SORT_RARITY = range(6)
+
+
+def _positions_to_bits(positions_by_key, size):
+    """{key: positions} -> {key: int bitset with bit i set for position i}"""
+    bitsets = {}
+    for key, positions in positions_by_key.items():
+        buffer = bytearray((size + 7) // 8)
+        for position in positions:
+            buffer[position >> 3] |= 1 << (position & 7)
+        bitsets[key] = int.from_bytes(buffer, 'little')
+    return bitsets
+
+
+# Bit offsets set in each byte value, to expand a bitset into positions
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def bits_to_positions(bits, size, is_stale=lambda: False):
+    """Positions of the set bits of a bitset, in increasing order"""
+    positions = array('I')
+    data = bits.to_bytes((size + 7) // 8, 'little')
+    for byte_index, byte in enumerate(data):
+        if byte:
+            base = byte_index << 3
+            positions.extend(base + bit for bit in _BYTE_BITS[byte])
+        if byte_index % CANCEL_CHECK_EVERY == 0 and is_stale():
+            raise FilterCancelled()
+    return positions
+
+
+class HistoryColumns:
+    """Filter index of the history: compact columns plus one bitset per value
+
+    Built once per load from the records (newest first, as in the History
+    tab) so that filtering never touches the record dicts or the localized
+    labels. Every banner family, item type, rarity and item ID has a Python
+    int whose bit i is set when record i has that value, so any combination
+    of dropdown filters is a handful of bitwise ANDs. Banner family, item
+    type and rarity are language independent; only the text search and the
+    sort orders of the named columns need the labels of a language.
+
+    Sort orders are permutations of all positions, computed on first use
+    for each column, direction and language and kept with the index.
+    """
+
+    def __init__(self, records, item_table, banner_mapping):
+        self.times = array('q')
+        self.families = array('B')
+        self.types = array('B')
+        self.rarities = array('B')
+        self.items = array('q')
+
+        family_positions, type_positions, rarity_positions, item_positions = {}, {}, {}, {}
+        for position, record in enumerate(records):
+            item_id = record['item']
+            _name, rarity, type_code = item_table.get(item_id) or ItemResolver.unknown(item_id)
+            family = banner_mapping.get(record['pool_id'], BANNER_PROMOTIONAL)
+            self.times.append(record['time'])
+            self.families.append(family)
+            self.types.append(type_code)
+            self.rarities.append(rarity)
+            self.items.append(item_id)
+            family_positions.setdefault(family, []).append(position)
+            type_positions.setdefault(type_code, []).append(position)
+            rarity_positions.setdefault(rarity, []).append(position)
+            item_positions.setdefault(item_id, []).append(position)
+
+        size = len(self.items)
+        self.all_bits = (1 << size) - 1
+        self.family_bits = _positions_to_bits(family_positions, size)
+        self.type_bits = _positions_to_bits(type_positions, size)
+        self.rarity_bits = _positions_to_bits(rarity_positions, size)
+        self.item_bits = _positions_to_bits(item_positions, size)
+        self._permutations = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def distinct_items(self):
+        return self.item_bits.keys()
+
+    def with_newer(self, newer):
+        """New index with the columns of newer records in front (after an import)
+
+        Every bitset is shifted by the number of new records. A new object is
+        returned so that a filter running on the worker thread keeps a
+        consistent snapshot.
+        """
+        shift = len(newer)
+        combined = HistoryColumns.__new__(HistoryColumns)
+        combined.times = newer.times + self.times
+        combined.families = newer.families + self.families
+        combined.types = newer.types + self.types
+        combined.rarities = newer.rarities + self.rarities
+        combined.items = newer.items + self.items
+        combined.all_bits = (1 << len(combined.items)) - 1
+        for name in ('family_bits', 'type_bits', 'rarity_bits', 'item_bits'):
+            merged = {key: bits << shift for key, bits in getattr(self, name).items()}
+            for key, bits in getattr(newer, name).items():
+                merged[key] = merged.get(key, 0) | bits
+            setattr(combined, name, merged)
+        combined._permutations = {}
+        return combined
+
+    def permutation(self, column, descending, query):
+        """All positions ordered by a column; ties stay newest first
+
+        Cached per column, direction and language. The labels the order was
+        built from are kept with it, so a reloaded localization rebuilds it.
+        """
+        labels = self._sort_labels(column, query)
+        key = (column, descending, query.language)
+        cached = self._permutations.get(key)
+        if cached is None or cached[0] != labels:
+            cached = (labels, self._build_permutation(column, descending, labels))
+            self._permutations[key] = cached
+        return cached[1]
+
+    def _sort_labels(self, column, query):
+        """Text each value of a named column is sorted by, or None for value order"""
+        if column == SORT_BANNER:
+            return tuple(label.casefold() for label in query.banner_labels)
+        if column == SORT_TYPE:
+            return {code: label.casefold() for code, label in query.type_labels.items()}
+        if column == SORT_ITEM:
+            return {item_id: (query.item_table.get(item_id) or ItemResolver.unknown(item_id))[0].casefold()
+                    for item_id in self.distinct_items}
+        return None
+
+    def _build_permutation(self, column, descending, labels):
+        size = len(self.items)
+        if column == SORT_DATE:
+            # Positions are already newest first
+            return array('I', range(size) if descending else range(size - 1, -1, -1))
+        if column == SORT_TIME:
+            seconds = [local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec
+                       for local in map(time.localtime, self.times)]
+            return array('I', sorted(range(size), key=seconds.__getitem__, reverse=descending))
+
+        values = {SORT_BANNER: self.families, SORT_ITEM: self.items,
+                  SORT_TYPE: self.types, SORT_RARITY: self.rarities}[column]
+        # One pass into buckets per value, then the buckets in value order
+        buckets = {}
+        for position, value in enumerate(values):
+            bucket = buckets.get(value)
+            if bucket is None:
+                bucket = buckets[value] = array('I')
+            bucket.append(position)
+
+        if labels is None:
+            sort_key = lambda value: value
+        elif isinstance(labels, tuple):
+            sort_key = lambda value: (labels[value] if value < len(labels) else "", value)
+        else:
+            sort_key = lambda value: (labels.get(value, ""), value)
+        permutation = array('I')
+        for value in sorted(buckets, key=sort_key, reverse=descending):
+            permutation.extend(buckets[value])
+        return permutation
+
+
+class FilterQuery:
+    """What the History filters ask for; None means 'any'"""
+
+    def __init__(self, families=None, type_code=None, rarity=None, text="", item_table=None, language=None,
+                 sort=None, banner_labels=(), type_labels=None):
+        self.families = families
+        self.type_code = type_code
+        self.rarity = rarity
+        self.text = text.lower()
+        self.item_table = item_table or {}
+        self.language = language
+        # (SORT_* column, descending) or None for the stored newest-first order
+        self.sort = sort
+        self.banner_labels = banner_labels
+        self.type_labels = type_labels or {}
+
+    def is_empty(self):
+        return self.families is None and self.type_code is None and self.rarity is None and not self.text
+
+
+class FilterCancelled(Exception):
+    """A newer filter request made this evaluation useless"""
+
+
+def matching_items(columns, query):
+    """Item IDs of the history whose name matches the search text (substring, or fuzzy if none)"""
+    index = get_name_index(query.item_table, query.language)
+    matches = index.search(query.text, within=columns.item_bits)
+    # Items missing from the reference data are shown (and searched) as "Item {id}"
+    for item_id in columns.distinct_items:
+        if item_id not in query.item_table and query.text in ItemResolver.unknown(item_id)[0].lower():
+            matches.add(item_id)
+    return matches
+
+
+def evaluate_filter(columns, query, is_stale=lambda: False):
+    """Positions (into the records the columns were built from) that pass the query, in its sort order"""
+    positions = filter_positions(columns, query, is_stale)
+    if query.sort is None:
+        return positions
+
+    permutation = columns.permutation(*query.sort, query)
+    if len(positions) == len(columns):
+        return permutation
+    # Walk the cached order and keep the positions that passed
+    passed = bytearray(len(columns))
+    for position in positions:
+        passed[position] = 1
+    if is_stale():
+        raise FilterCancelled()
+    return array('I', [position for position in permutation if passed[position]])
+
+
+def filter_positions(columns, query, is_stale=lambda: False):
+    """Positions that pass the query's filters, newest first"""
+    if query.is_empty():
+        return range(len(columns))
+
+    mask = columns.all_bits
+    if query.families is not None:
+        family_mask = 0
+        for family in query.families:
+            family_mask |= columns.family_bits.get(family, 0)
+        mask &= family_mask
+    if query.type_code is not None:
+        mask &= columns.type_bits.get(query.type_code, 0)
+    if query.rarity is not None:
+        mask &= columns.rarity_bits.get(query.rarity, 0)
+
+    # Names are only checked for items that still have rows after the dropdowns
+    if query.text and mask:
+        text_mask = 0
+        for item_id in matching_items(columns, query):
+            item_bits = columns.item_bits[item_id]
+            if mask & item_bits:
+                text_mask |= item_bits
+        mask &= text_mask
+
+    if mask == columns.all_bits:
+        return range(len(columns))
+    return bits_to_positions(mask, len(columns), is_stale)
+
+
+class BackgroundFilter:
+    """Debounced filter evaluation on a worker thread
+
+    Each request waits `delay_ms` for more input, then runs on a single
+    worker thread. Every request bumps a generation number; an evaluation
+    that is overtaken stops at its next check and its result is dropped,
+    so only the latest query ever reaches `deliver` (on the Tk thread,
+    through `root.after`).
+    """
+
+    def __init__(self, root, deliver, delay_ms=150):
+        self.root = root
+        self.deliver = deliver
+        self.delay_ms = delay_ms
+        self.generation = 0
+        self._after_id = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-filter")
+
+    def request(self, columns, query, debounce=True):
+        """Schedules an evaluation, replacing any pending or running one"""
+        self.generation += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.delay_ms if debounce else 0,
+                                         self._start, self.generation, columns, query)
+
+    def cancel(self):
+        """Drops pending and running evaluations"""
+        self.generation += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _start(self, generation, columns, query):
+        self._after_id = None
+        if generation == self.generation:
+            self._executor.submit(self._run, generation, columns, query)
+
+    def _run(self, generation, columns, query):
+        is_stale = lambda: generation != self.generation
+        try:
+            result = evaluate_filter(columns, query, is_stale)
+        except FilterCancelled:
+            return
+        except Exception as e:
+            print(f"Error filtering history: {e}")
+            return
+        if not is_stale():
+            self.root.after(0, self._deliver, generation, result)
+
+    def _deliver(self, generation, result):
+        # A newer request may have arrived while this result was queued
+        if generation == self.generation:
+            self.deliver(result)
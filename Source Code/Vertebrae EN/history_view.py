@@ -0,0 +1,229 @@
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from tkinter import ttk
+
+
+@lru_cache(maxsize=4096)
+def format_timestamp(timestamp):
+    """(date, time) display strings of a Unix timestamp; a multi formats it once"""
+    dt = datetime.fromtimestamp(timestamp)
+    return dt.strftime("%Y-%m-%d"), dt.strftime("%H:%M:%S")
+
+
+class FormattedRowCache:
+    """LRU cache of the Treeview values of history records
+
+    Rows are keyed by the record fields the History shows (time, pool_id,
+    item), so copies of an item in one multi share an entry and keys stay
+    valid when an import or a sort moves records to other positions. The
+    values hold localized names, so `clear` must be called when the
+    language or the reference data changes.
+    """
+
+    def __init__(self, format_record, max_rows=20000):
+        self.format_record = format_record
+        self.max_rows = max_rows
+        self._rows = OrderedDict()
+
+    def get(self, record):
+        key = (record['time'], record['pool_id'], record['item'])
+        values = self._rows.get(key)
+        if values is not None:
+            self._rows.move_to_end(key)
+            return values
+        values = self.format_record(record)
+        self._rows[key] = values
+        if len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+        return values
+
+    def clear(self):
+        self._rows.clear()
+
+
+class VirtualHistoryView:
+    """Treeview that only holds the rows on screen
+
+    The whole (filtered) history lives in `rows`, a sequence of record
+    positions. The Treeview keeps a fixed pool of items, one per visible
+    line plus a small overscan for the partially visible bottom line, and
+    scrolling only rewrites their values. The scrollbar is driven by the
+    offset into `rows` instead of by the Treeview, so showing, scrolling and
+    refiltering cost the same for any history size.
+    """
+
+    DEFAULT_ROW_HEIGHT = 20
+    WHEEL_ROWS = 3
+
+    def __init__(self, tree, scrollbar, format_row, row_tags=None, overscan=2):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.format_row = format_row
+        self.row_tags = row_tags or (lambda position: ())
+        self.overscan = overscan
+
+        self.rows = ()
+        self.offset = 0
+        self.visible_rows = max(1, int(tree.cget('height')))
+        self.pool = []  # Treeview iids, top to bottom
+        self.shown = {}  # iid -> (position, values, tags) currently displayed
+        self.selected = set()  # Selected record positions, kept while scrolling
+        self._rendered_selection = ()
+
+        scrollbar.configure(command=self.yview)
+        tree.bind('<Configure>', self._on_configure)
+        tree.bind('<MouseWheel>', self._on_mousewheel)
+        tree.bind('<Button-4>', lambda e: self._scroll_wheel(-self.WHEEL_ROWS))
+        tree.bind('<Button-5>', lambda e: self._scroll_wheel(self.WHEEL_ROWS))
+        tree.bind('<Up>', lambda e: self._move_focus(-1))
+        tree.bind('<Down>', lambda e: self._move_focus(1))
+        tree.bind('<Prior>', lambda e: self._move_focus(-self.visible_rows))
+        tree.bind('<Next>', lambda e: self._move_focus(self.visible_rows))
+        tree.bind('<Home>', lambda e: self._move_focus(-len(self.rows)))
+        tree.bind('<End>', lambda e: self._move_focus(len(self.rows)))
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+
+    def __len__(self):
+        return len(self.rows)
+
+    def set_rows(self, rows, keep_offset=False):
+        """Shows a new sequence of record positions
+
+        With `keep_offset` a view scrolled away from the top keeps the record
+        that was on its first line there, if it is still in `rows`; otherwise
+        the same offset is kept. Without it the view goes back to the top.
+        """
+        top = self.rows[self.offset] if keep_offset and self.offset and self.offset < len(self.rows) else None
+        self.rows = rows
+        if top is None:
+            if not keep_offset:
+                self.offset = 0
+        else:
+            try:
+                self.offset = rows.index(top)
+            except ValueError:
+                pass
+        self.render()
+
+    def insert_at_top(self, count, rows):
+        """Shows `rows` after `count` records were added in front of the history
+
+        Record positions already known move down by `count`. The selection
+        follows its records, and a view scrolled away from the top keeps
+        showing the same rows; at the top, the new rows appear.
+        """
+        self.selected = {position + count for position in self.selected}
+        if self.offset:
+            self.offset += len(rows) - len(self.rows)
+        self.rows = rows
+        self.render()
+
+    def refresh(self):
+        """Re-renders the visible rows; only the ones whose text changed are touched"""
+        self.render()
+
+    def scroll_to(self, offset):
+        """Moves the first visible row to `offset` (clamped)"""
+        self.offset = offset
+        self.render()
+
+    def yview(self, *args):
+        """Scrollbar command ('moveto', fraction) / ('scroll', n, 'units'|'pages')"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def render(self):
+        """Fills the item pool from `rows` starting at `offset`"""
+        total = len(self.rows)
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+        wanted = max(0, min(self.visible_rows + self.overscan, total - self.offset))
+
+        while len(self.pool) < wanted:
+            iid = f"row{len(self.pool)}"
+            self.tree.insert('', 'end', iid=iid)
+            self.pool.append(iid)
+        while len(self.pool) > wanted:
+            iid = self.pool.pop()
+            self.tree.delete(iid)
+            self.shown.pop(iid, None)
+
+        selection = []
+        for index, iid in enumerate(self.pool):
+            position = self.rows[self.offset + index]
+            entry = (position, self.format_row(position), tuple(self.row_tags(position)))
+            if self.shown.get(iid) != entry:
+                self.tree.item(iid, values=entry[1], tags=entry[2])
+                self.shown[iid] = entry
+            if position in self.selected:
+                selection.append(iid)
+
+        selection = tuple(selection)
+        if selection != tuple(self.tree.selection()):
+            self._rendered_selection = selection
+            self.tree.selection_set(selection)
+        # The pool always starts at the top; the Treeview itself never scrolls
+        self.tree.yview_moveto(0)
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _row_metrics(self):
+        """(heading height, row height) in pixels"""
+        if self.pool:
+            bbox = self.tree.bbox(self.pool[0])
+            if bbox:
+                return bbox[1], bbox[3]
+        try:
+            row_height = int(ttk.Style().lookup('Treeview', 'rowheight'))
+        except (TypeError, ValueError):
+            row_height = self.DEFAULT_ROW_HEIGHT
+        return row_height + 4, row_height
+
+    def _on_configure(self, event):
+        heading_height, row_height = self._row_metrics()
+        visible_rows = max(1, (event.height - heading_height) // max(1, row_height))
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render()
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        return self._scroll_wheel(-self.WHEEL_ROWS if event.delta > 0 else self.WHEEL_ROWS)
+
+    def _scroll_wheel(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
+
+    def _move_focus(self, delta):
+        """Keyboard navigation over the whole history, scrolling as needed"""
+        if not self.rows:
+            return "break"
+        focus = self.tree.focus()
+        index = self.offset + self.pool.index(focus) if focus in self.pool else self.offset - 1
+        index = max(0, min(len(self.rows) - 1, index + delta))
+
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible_rows:
+            self.offset = index - self.visible_rows + 1
+        self.selected = {self.rows[index]}
+        self.render()
+
+        iid = self.pool[index - self.offset]
+        self.tree.focus(iid)
+        self.tree.event_generate('<<TreeviewSelect>>')
+        return "break"
+
+    def _on_select(self, event=None):
+        # Selection changes made by render() arrive here later; they are not user choices
+        if tuple(self.tree.selection()) == self._rendered_selection:
+            return
+        self.selected = {self.shown[iid][0] for iid in self.tree.selection() if iid in self.shown}
@@ -0,0 +1,99 @@
+import logging
+import os
+import queue
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+LOG_FILE_MAX_BYTES = 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+
+def create_file_logger(path):
+    """Logger writing every import line to a rotating file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    logger = logging.getLogger(f"vertebrae.import.{path}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = RotatingFileHandler(path, maxBytes=LOG_FILE_MAX_BYTES,
+                                      backupCount=LOG_FILE_BACKUPS, encoding='utf-8')
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+
+class ImportLog:
+    """Thread-safe, bounded log channel for a Text widget
+
+    Any thread may call `write`; lines only go into a queue. A `root.after`
+    pump on the Tk thread drains up to `batch_lines` lines per tick and adds
+    them with a single insert, so the worker never waits for the GUI to
+    redraw and the widget is only touched from the Tk thread.
+
+    The widget works as a ring buffer of about `max_lines` lines: once it
+    holds 10% more, the oldest lines are deleted in one call. If `log_file`
+    is given, every line is also written to a rotating file, so nothing is
+    lost when it scrolls out of the widget.
+    """
+
+    def __init__(self, root, text_widget, max_lines=1000, log_file=None, batch_lines=200, interval_ms=50):
+        self.root = root
+        self.text = text_widget
+        self.max_lines = max(1, max_lines)
+        self.batch_lines = batch_lines
+        self.interval_ms = interval_ms
+        self.file_logger = create_file_logger(log_file) if log_file else None
+        self._queue = queue.SimpleQueue()
+        self._line_count = 0
+        self.root.after(self.interval_ms, self._pump)
+
+    def configure(self, max_lines, log_file=None):
+        """Applies new settings; the widget is trimmed on the next tick if needed"""
+        self.max_lines = max(1, max_lines)
+        self.file_logger = create_file_logger(log_file) if log_file else None
+
+    def write(self, message):
+        """Queues a line (timestamped now, not when it is shown)"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self._queue.put(f"[{timestamp}] {message}\n")
+        if self.file_logger is not None:
+            self.file_logger.info(message)
+
+    def clear(self):
+        """Empties the widget and drops lines not shown yet (Tk thread only)"""
+        self._drain_queue(limit=None)
+        self.text.config(state='normal')
+        self.text.delete('1.0', 'end')
+        self.text.config(state='disabled')
+        self._line_count = 0
+
+    def _drain_queue(self, limit):
+        lines = []
+        while limit is None or len(lines) < limit:
+            try:
+                lines.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return lines
+
+    def _pump(self):
+        try:
+            # Lines that would scroll out before being seen are skipped (they are in the file)
+            backlog = self._queue.qsize() - self.max_lines
+            if backlog > 0:
+                self._drain_queue(backlog)
+
+            lines = self._drain_queue(self.batch_lines)
+            if lines:
+                chunk = ''.join(lines)
+                self.text.config(state='normal')
+                self.text.insert('end', chunk)
+                self._line_count += chunk.count('\n')
+                if self._line_count > self.max_lines * 1.1:
+                    excess = self._line_count - self.max_lines
+                    self.text.delete('1.0', f'{excess + 1}.0')
+                    self._line_count -= excess
+                self.text.see('end')
+                self.text.config(state='disabled')
+        finally:
+            self.root.after(self.interval_ms, self._pump)
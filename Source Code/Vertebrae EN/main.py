@@ -2,21 +2,44 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
 import time
-from datetime import datetime
-import math
 import json
 import os
+from array import array
+from collections import Counter
 
 # Import our functional module
 from gacha_api import (
-    SimpleGachaBackup, get_all_pages_for_type, get_banner_name, 
-    get_item_name, get_item_type, DataManager, SERVERS, 
-    get_server_display_name, ConfigManager, LocalizationManager, _
+    SimpleGachaBackup, get_all_pages_for_type, 
+    DataManager, SERVERS, 
+    get_server_display_name, ConfigManager, LocalizationManager, ReferenceDataLoader, _,
+    IMPORT_LOG_FILE, IMPORT_TYPE_IDS, ImportProgress,
+    ItemResolver, ITEM_CHARACTER, ITEM_WEAPON, ITEM_MBOX,
+    BannerClassifier, BANNER_FAMILY_KEYS, BANNER_CHARACTERS, BANNER_PROMOTIONAL, BANNER_WEAPONS,
+    BANNER_PERMANENT, BANNER_BEGINNER, BANNER_MYSTERY_BOX, BANNER_SPECIAL, BANNER_EVENT
 )
+from pull_planner import RULE_SETS, RULE_SET_FAMILIES, get_planner
+from history_view import VirtualHistoryView, FormattedRowCache, format_timestamp
+from history_filter import HistoryColumns, FilterQuery, BackgroundFilter
+from name_search import get_name_trie
+from search_autocomplete import SearchAutocomplete
+from import_log import ImportLog
+from pie_chart import PieChart
 
 class GachaTrackerGUI:
+    # How often data/*.json and localization files are checked for changes (ms)
+    REFERENCE_POLL_INTERVAL = 2000
+    
     def __init__(self, root):
         self.root = root
+        
+        # Load language from configuration
+        self.current_language = ConfigManager.get_setting('default_language', 'EN')
+        
+        # Reference data (data/*.json and localization) is read in parallel in the background
+        self.reference_data = ReferenceDataLoader(self.current_language)
+        # Widget texts need the translations; the item and banner tables keep loading meanwhile
+        self.reference_data.wait('localization')
+        
         self.root.title(_("ui.title"))
         self.root.geometry("1000x750")
         self.root.minsize(900, 650)
@@ -25,35 +48,155 @@ class GachaTrackerGUI:
         self.backup = SimpleGachaBackup()
         self.is_importing = False
         
-        # Load data at startup
-        self.data_manager = DataManager()
-        self.dolls_data = self.data_manager.load_dolls()
-        self.weapons_data = self.data_manager.load_weapons()
-        self.mbox_data = self.data_manager.load_mbox()
-        
-        # Load language from configuration
-        self.current_language = ConfigManager.get_setting('default_language', 'EN')
-        LocalizationManager.set_language(self.current_language)
-        
-        # Data for filters
+        # Data for filters (newest first, same order as the multi index)
         self.all_records = []
-        self.current_stats = None
+        self.multi_index = None
+        # True until the startup load has computed the statistics (see auto_load_data)
+        self.history_loading = True
+        
+        # Filters run on a worker thread over precomputed columns of all_records
+        self.filter_columns = None
+        self.history_filter = BackgroundFilter(self.root, self.show_filter_results)
+        # (SORT_* column, descending) chosen from the History headings, None = newest first
+        self.history_sort = None
+        # Whether the pending filter result refreshes the shown query (see apply_filters)
+        self.history_keep_offset = False
+        # Formatted History rows, so scrolling back or refiltering is one lookup per row
+        self.row_cache = FormattedRowCache(lambda record: self.format_history_row(record, self.get_row_context()))
+        # Lookup tables the rows are formatted with; reset with the cache (see clear_row_cache)
+        self.row_context = None
+        # Pulls per item in the history, used to rank search suggestions
+        self.item_counts = Counter()
+        
+        # Widgets showing localized texts, kept by key so a language switch can relabel them
+        self.text_keys = []  # (widget, key)
+        self.choice_keys = []  # (combobox, key of each option)
+        self.history_heading_keys = {}  # History column -> key
         
         self.setup_ui()
         self.create_menu()
+        
+        # Automatically load history once the interface and reference data are ready
+        self.root.after(50, self.wait_for_reference_data)
+        
+    def wait_for_reference_data(self):
+        """Polls the background loader so the first history render never blocks on file I/O"""
+        if self.reference_data.is_ready():
+            self.auto_load_data()
+            self.root.after(self.REFERENCE_POLL_INTERVAL, self.poll_reference_data)
+        else:
+            self.root.after(50, self.wait_for_reference_data)
+        
+    def poll_reference_data(self):
+        """Reloads data/*.json and localization files edited on disk, without restarting"""
+        try:
+            changed = DataManager.reload_changed()
+            if changed:
+                print(f"🔄 Reference data reloaded: {', '.join(sorted(changed))}")
+                self.on_reference_data_changed(changed)
+        except Exception as e:
+            print(f"Error reloading reference data: {e}")
+        self.root.after(self.REFERENCE_POLL_INTERVAL, self.poll_reference_data)
+        
+    def on_reference_data_changed(self, changed):
+        """Refreshes what depends on reloaded reference data"""
+        if any(name.startswith('localization_') for name in changed):
+            self.refresh_window_texts()
+            self.relabel_widgets()
+        self.clear_row_cache()
+        
+        self.filter_columns = self.build_filter_columns(self.all_records)
+        if self.history_query_active():
+            # Item types, rarities or banners may have moved rows in or out of the filter
+            self.apply_filters(keep_offset=True)
+        else:
+            self.refresh_visible_rows()
+        
         self.update_status_bar()
+        self.update_stats_display()
+        self.refresh_planner_pity()
+        
+    def filters_active(self):
+        """Whether any History filter differs from its default"""
+        # Typed text that matches no option filters nothing (see apply_filters)
+        return bool(self.search_entry.get() or self.banner_filter.current() > 0 or
+                    self.type_filter.current() > 0 or self.rarity_filter.current() > 0)
         
-        # Automatically load history after the interface is ready
-        self.root.after(500, self.auto_load_data)
+    def history_query_active(self):
+        """Whether the History shows filtered or re-sorted rows instead of all records"""
+        return self.filters_active() or self.history_sort is not None
+        
+    def refresh_visible_rows(self):
+        """Re-renders in place only the History rows whose text changed"""
+        self.history_view.refresh()
         
     def auto_load_data(self):
-        """Automatically loads history and statistics on startup"""
+        """Loads history and statistics on startup in a separate thread"""
+        self.show_loading_state()
+        thread = threading.Thread(target=self.run_startup_load)
+        thread.daemon = True
+        thread.start()
+        
+    def show_loading_state(self):
+        """Placeholder texts shown until the history is decoded"""
+        self.history_loading = True
+        self.record_count_label.config(text="⏳")
+        self.status_label.config(text="⏳ Loading history...")
+        self.stats_text.config(state='normal')
+        self.stats_text.delete('1.0', 'end')
+        self.stats_text.insert('1.0', "⏳ Loading statistics...")
+        self.stats_text.config(state='disabled')
+        
+    def run_startup_load(self):
+        """Decodes the backup in stages (in separate thread)
+        
+        Each stage is handed to the Tk thread as soon as it is ready: first the
+        sorted history, which the virtual table shows from the newest row with
+        the cost of one screen, then the filter index, and last the statistics.
+        """
         try:
-            self.load_history()
-            self.update_stats_display()
-            print("✅ History and statistics automatically loaded")
+            index = self.backup.get_multi_index()
+            self.root.after(0, self.show_startup_history, index)
+            
+            columns = self.build_filter_columns(index.records)
+            item_counts = Counter(record['item'] for record in index.records)
+            self.root.after(0, self.enable_filters, index, columns, item_counts)
+            
+            self.backup.get_derived()
+            self.root.after(0, self.on_startup_load_finished)
         except Exception as e:
             print(f"❌ Error automatically loading data: {e}")
+            self.root.after(0, self.on_startup_load_error, str(e))
+            
+    def show_startup_history(self, index):
+        """First stage of the startup load: rows are browsable, filters not ready yet"""
+        self.show_history(index)
+        self.record_count_label.config(text=_(f"ui.pulls").format(count=len(index.records)))
+        
+    def enable_filters(self, index, columns, item_counts):
+        """Second stage of the startup load: the filter index for the shown history"""
+        # An import may have reloaded the history in the meantime
+        if index is not self.multi_index:
+            return
+        self.filter_columns = columns
+        self.item_counts = item_counts
+        if self.history_query_active():
+            self.apply_filters()
+            
+    def on_startup_load_finished(self):
+        """Last stage of the startup load: statistics and pity"""
+        self.history_loading = False
+        self.update_status_bar()
+        self.update_stats_display()
+        self.refresh_planner_pity()
+        if self.notebook.tab(self.notebook.select(), "text") == _("ui.history_tab"):
+            self.on_tab_changed(None)
+        print("✅ History and statistics automatically loaded")
+        
+    def on_startup_load_error(self, error_msg):
+        """When the startup load fails"""
+        self.history_loading = False
+        self.status_label.config(text=f"❌ Error loading history: {error_msg}")
     
     def create_menu(self):
         """Creates the menu bar"""
@@ -85,7 +228,7 @@ class GachaTrackerGUI:
         """Creates the settings window"""
         settings_window = tk.Toplevel(self.root)
         settings_window.title(_("ui.settings") + " - Vertebrae")
-        settings_window.geometry("500x350")
+        settings_window.geometry("500x420")
         settings_window.resizable(True, True)
         settings_window.transient(self.root)
         settings_window.grab_set()
@@ -106,6 +249,8 @@ class GachaTrackerGUI:
         retries_var = tk.StringVar(value=str(settings['max_retries']))
         language_var = tk.StringVar(value=settings['default_language'])
         theme_var = tk.StringVar(value=settings['theme'])
+        log_lines_var = tk.StringVar(value=str(settings.get('log_max_lines', 1000)))
+        log_to_file_var = tk.BooleanVar(value=settings.get('log_to_file', False))
         
         # Main frame with scroll
         main_frame = ttk.Frame(settings_window)
@@ -140,9 +285,9 @@ class GachaTrackerGUI:
         app_frame.pack(fill=tk.X, pady=(0, 10))
         
         # Language
-        ttk.Label(app_frame, text="Language (Work in Progress):").grid(row=0, column=0, sticky=tk.W, pady=2)
+        ttk.Label(app_frame, text="Language:").grid(row=0, column=0, sticky=tk.W, pady=2)
         language_combo = ttk.Combobox(app_frame, textvariable=language_var, 
-                                     values=["ES", "EN"], state="readonly", width=10)
+                                     values=DataManager.get_available_languages(), state="readonly", width=10)
         language_combo.grid(row=0, column=1, sticky=tk.W, pady=2, padx=(10, 0))
         
         # Theme
@@ -151,6 +296,14 @@ class GachaTrackerGUI:
                                   values=["System", "Light", "Dark"], state="readonly", width=10)
         theme_combo.grid(row=1, column=1, sticky=tk.W, pady=2, padx=(10, 0))
         
+        # Import log
+        ttk.Label(app_frame, text="Import log lines kept:").grid(row=2, column=0, sticky=tk.W, pady=2)
+        log_lines_spinbox = ttk.Spinbox(app_frame, from_=100, to=100000, increment=100, 
+                                        textvariable=log_lines_var, width=10)
+        log_lines_spinbox.grid(row=2, column=1, sticky=tk.W, pady=2, padx=(10, 0))
+        ttk.Checkbutton(app_frame, text="Save full import log to logs/import.log", 
+                        variable=log_to_file_var).grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=2)
+        
         # Buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=20)
@@ -168,12 +321,19 @@ class GachaTrackerGUI:
                         messagebox.showerror("Error", "Page limit must be -1 (no limit) or a positive number")
                         return
                 
+                log_max_lines = int(log_lines_var.get())
+                if log_max_lines < 1:
+                    messagebox.showerror("Error", "Import log lines must be a positive number")
+                    return
+                
                 new_settings = {
                     'page_limit': page_limit,
                     'request_timeout': int(timeout_var.get()),
                     'max_retries': int(retries_var.get()),
                     'default_language': language_var.get(),
-                    'theme': theme_var.get()
+                    'theme': theme_var.get(),
+                    'log_max_lines': log_max_lines,
+                    'log_to_file': log_to_file_var.get()
                 }
                 
                 # Apply theme immediately
@@ -182,20 +342,14 @@ class GachaTrackerGUI:
                     self.change_theme(theme_var.get())
                 
                 # Save configuration
-                config['settings'] = new_settings
+                config['settings'].update(new_settings)
                 ConfigManager._config = config
                 if ConfigManager.save_config():
-                    # Update language if changed
-                    if language_var.get() != self.current_language:
-                        self.current_language = language_var.get()
-                        LocalizationManager.set_language(self.current_language)
-                        self.refresh_ui_texts()
-                        messagebox.showinfo("Success", "Options saved. Restart the app to apply language changes.")
-                        settings_window.destroy()
-                        self.root.after(1000, self.restart_app)
-                    else:
-                        messagebox.showinfo("Success", "Options saved")
-                        settings_window.destroy()
+                    self.import_log_channel.configure(*self.get_log_settings())
+                    settings_window.destroy()
+                    # Language changes apply in place, no restart needed
+                    self.switch_language(language_var.get())
+                    messagebox.showinfo("Success", "Options saved")
                 else:
                     messagebox.showerror("Error", "Could not save changes")
                     
@@ -214,7 +368,9 @@ class GachaTrackerGUI:
                         "request_timeout": 20,
                         "max_retries": 3,
                         "default_language": "EN",
-                        "theme": "system"
+                        "theme": "system",
+                        "log_max_lines": 1000,
+                        "log_to_file": False
                     }
                 }
                 ConfigManager._config = default_config
@@ -238,8 +394,58 @@ class GachaTrackerGUI:
         # Restart implementation
         pass
     
-    def refresh_ui_texts(self):
-        """Updates all interface texts when language changes"""
+    def switch_language(self, language):
+        """Switches the interface language in place, keeping loaded rows and widget state"""
+        if language == self.current_language:
+            return
+        
+        LocalizationManager.set_language(language)
+        self.current_language = DataManager._current_language
+        self.clear_row_cache()
+        
+        self.refresh_window_texts()
+        self.relabel_widgets()
+        
+        # Item and banner names come from the cached per-language tables
+        if self.history_sort is not None:
+            # Named columns sort differently in another language
+            self.apply_filters(keep_offset=True)
+        else:
+            self.refresh_visible_rows()
+        self.update_status_bar()
+        self.update_stats_display()
+        self.refresh_planner_pity()
+        print(f"🌐 Language switched to {self.current_language}")
+        
+    def translated(self, widget, key):
+        """Shows the translation of `key` on a widget and keeps it translated on language switches"""
+        widget.configure(text=_(key))
+        self.text_keys.append((widget, key))
+        return widget
+        
+    def translated_choices(self, combobox, keys):
+        """Fills a combobox with the translations of `keys`, in that order, and keeps them translated"""
+        combobox.configure(values=[_(key) for key in keys])
+        self.choice_keys.append((combobox, keys))
+        return combobox
+        
+    def relabel_widgets(self):
+        """Shows the registered widget texts in the current language"""
+        for widget, key in self.text_keys:
+            widget.configure(text=_(key))
+        for combobox, keys in self.choice_keys:
+            # Options keep their position, so the selection is kept by index
+            index = combobox.current()
+            combobox.configure(values=[_(key) for key in keys])
+            if index >= 0:
+                combobox.current(index)
+        for column, key in self.history_heading_keys.items():
+            # A sort arrow stays after the translated heading
+            text = self.history_tree.heading(column, 'text')
+            self.history_tree.heading(column, text=_(key) + text[len(text.rstrip(' ▲▼')):])
+        
+    def refresh_window_texts(self):
+        """Updates the window title, tab names and menu bar"""
         # Update window title
         self.root.title(_("ui.title"))
         
@@ -247,16 +453,10 @@ class GachaTrackerGUI:
         self.notebook.tab(0, text=_("ui.import_tab"))
         self.notebook.tab(1, text=_("ui.history_tab"))
         self.notebook.tab(2, text=_("ui.stats_tab"))
+        self.notebook.tab(3, text=_("ui.planner_tab"))
         
         # Update menu bar
         self.create_menu()
-        
-        # Update status bar
-        self.update_status_bar()
-        
-        # Reload data to update translated names
-        self.load_history()
-        self.update_stats_display()
     
     def setup_ui(self):
         """Sets up the main interface with tabs"""
@@ -275,8 +475,7 @@ class GachaTrackerGUI:
         header_frame.grid_columnconfigure(0, weight=1)
         header_frame.grid_columnconfigure(1, weight=0)
         
-        title_label = ttk.Label(header_frame, text=_("ui.title"), 
-                               font=('Arial', 16, 'bold'))
+        title_label = self.translated(ttk.Label(header_frame, font=('Arial', 16, 'bold')), "ui.title")
         title_label.grid(row=0, column=0, sticky='w')
         
         help_btn = ttk.Button(header_frame, text="?", width=3, 
@@ -293,11 +492,10 @@ class GachaTrackerGUI:
         self.setup_import_tab()
         self.setup_history_tab()
         self.setup_stats_tab()
+        self.setup_planner_tab()
         
         self.setup_status_bar()
         
-        self.root.bind('<Configure>', self.on_window_resize)
-        
     def show_help(self):
         """Shows help information to the user"""
         help_text = """🎮 **QUICK GUIDE - VERTEBRAE GACHA TRACKER**
@@ -378,35 +576,20 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         y = self.root.winfo_y() + (self.root.winfo_height() // 2) - (help_window.winfo_height() // 2)
         help_window.geometry(f"+{x}+{y}")
         
-    def on_window_resize(self, event):
-        """Executes when the window is resized"""
-        if (hasattr(self, 'current_stats') and self.current_stats and 
-            self.notebook.tab(self.notebook.select(), "text") == _("ui.stats_tab")):
-            if hasattr(self, '_resize_after_id'):
-                self.root.after_cancel(self._resize_after_id)
-            self._resize_after_id = self.root.after(200, self.redraw_pie_chart)
-        
-    def redraw_pie_chart(self):
-        """Redraws the pie chart with current statistics"""
-        if self.current_stats:
-            self.create_pie_chart(self.current_stats)
-        
     def on_tab_changed(self, event):
         """Executes when switching tabs"""
         current_tab = self.notebook.tab(self.notebook.select(), "text")
         
         if current_tab == _("ui.history_tab"):
             if hasattr(self, 'all_records'):
-                filtered_count = len(self.history_tree.get_children())
+                filtered_count = len(self.history_view)
                 total_count = len(self.all_records)
                 if filtered_count == total_count:
                     self.status_label.config(text=_(f"messages.showing_all").format(count=total_count))
                 else:
                     self.status_label.config(text=_(f"messages.filtered").format(filtered=filtered_count, total=total_count))
-        elif current_tab == _("ui.stats_tab"):
-            if hasattr(self, 'current_stats') and self.current_stats:
-                self.root.after(100, lambda: self.create_pie_chart(self.current_stats))
-        else:
+        elif current_tab != _("ui.stats_tab"):
+            # The pie chart fits itself to the canvas when the tab is shown
             self.update_status_bar()
         
     def setup_import_tab(self):
@@ -417,11 +600,10 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         self.import_tab.grid_rowconfigure(1, weight=1)
         self.import_tab.grid_columnconfigure(0, weight=1)
         
-        title_label = ttk.Label(self.import_tab, text=_("ui.import_title"), 
-                               font=('Arial', 16, 'bold'))
+        title_label = self.translated(ttk.Label(self.import_tab, font=('Arial', 16, 'bold')), "ui.import_title")
         title_label.grid(row=0, column=0, sticky='ew', pady=(0, 20))
         
-        config_frame = ttk.LabelFrame(self.import_tab, text=_("ui.account_data"), padding=15)
+        config_frame = self.translated(ttk.LabelFrame(self.import_tab, padding=15), "ui.account_data")
         config_frame.grid(row=1, column=0, sticky='nsew', pady=(0, 10))
         
         config_frame.grid_rowconfigure(0, weight=0)
@@ -429,15 +611,15 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         config_frame.grid_rowconfigure(2, weight=0)
         config_frame.grid_columnconfigure(1, weight=1)
         
-        ttk.Label(config_frame, text=_("ui.auth_token"), font=('Arial', 10, 'bold')).grid(row=0, column=0, sticky='nw', pady=8)
+        self.translated(ttk.Label(config_frame, font=('Arial', 10, 'bold')), "ui.auth_token").grid(row=0, column=0, sticky='nw', pady=8)
         self.token_entry = scrolledtext.ScrolledText(config_frame, height=4, font=('Consolas', 9))
         self.token_entry.grid(row=0, column=1, padx=10, pady=8, sticky='ew')
         
-        ttk.Label(config_frame, text=_("ui.email"), font=('Arial', 10, 'bold')).grid(row=1, column=0, sticky='nw', pady=8)
+        self.translated(ttk.Label(config_frame, font=('Arial', 10, 'bold')), "ui.email").grid(row=1, column=0, sticky='nw', pady=8)
         self.email_entry = ttk.Entry(config_frame, font=('Arial', 10))
         self.email_entry.grid(row=1, column=1, padx=10, pady=8, sticky='ew')
         
-        ttk.Label(config_frame, text=_("ui.server"), font=('Arial', 10, 'bold')).grid(row=2, column=0, sticky='nw', pady=8)
+        self.translated(ttk.Label(config_frame, font=('Arial', 10, 'bold')), "ui.server").grid(row=2, column=0, sticky='nw', pady=8)
         
         server_names = [config["name"] for config in SERVERS.values()]
         self.server_combobox = ttk.Combobox(config_frame, values=server_names, width=30, font=('Arial', 10))
@@ -451,18 +633,32 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         bottom_frame.grid_rowconfigure(1, weight=0)
         bottom_frame.grid_columnconfigure(0, weight=1)
         
-        progress_frame = ttk.LabelFrame(bottom_frame, text=_("ui.import_progress"), padding=15)
+        progress_frame = self.translated(ttk.LabelFrame(bottom_frame, padding=15), "ui.import_progress")
         progress_frame.grid(row=0, column=0, sticky='nsew', pady=(0, 10))
         
         progress_frame.grid_rowconfigure(1, weight=1)
         progress_frame.grid_columnconfigure(0, weight=1)
         
-        self.progress_bar = ttk.Progressbar(progress_frame, mode='indeterminate')
-        self.progress_bar.grid(row=0, column=0, sticky='ew', pady=(0, 10))
+        # One bar per banner family (type_id) queried by the import
+        bars_frame = ttk.Frame(progress_frame)
+        bars_frame.grid(row=0, column=0, sticky='ew', pady=(0, 10))
+        bars_frame.grid_columnconfigure(1, weight=1)
+        
+        self.progress_rows = {}
+        for row, (type_id, family) in enumerate(IMPORT_TYPE_IDS.items()):
+            self.translated(ttk.Label(bars_frame), f"banners.{BANNER_FAMILY_KEYS[family]}").grid(
+                row=row, column=0, sticky='w', padx=(0, 10))
+            bar = ttk.Progressbar(bars_frame, mode='determinate')
+            bar.grid(row=row, column=1, sticky='ew', pady=1)
+            detail_label = ttk.Label(bars_frame, text="", width=44)
+            detail_label.grid(row=row, column=2, sticky='w', padx=(10, 0))
+            self.progress_rows[type_id] = (bar, detail_label)
         
         self.import_log = scrolledtext.ScrolledText(progress_frame, height=8, state='disabled', 
                                                    font=('Consolas', 9), wrap=tk.WORD)
         self.import_log.grid(row=1, column=0, sticky='nsew')
+        # The import thread only queues lines; the Tk thread shows them in batches
+        self.import_log_channel = ImportLog(self.root, self.import_log, *self.get_log_settings())
         
         button_frame = ttk.Frame(bottom_frame)
         button_frame.grid(row=1, column=0, sticky='ew', pady=10)
@@ -473,15 +669,12 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         button_frame.grid_columnconfigure(3, weight=0)
         button_frame.grid_columnconfigure(4, weight=1)
         
-        self.import_btn = ttk.Button(button_frame, text=_("ui.start_import"), 
-                                   command=self.start_import)
+        self.import_btn = self.translated(ttk.Button(button_frame, command=self.start_import), "ui.start_import")
         self.import_btn.grid(row=0, column=1, padx=5)
         
-        ttk.Button(button_frame, text=_("ui.view_stats"), 
-                  command=self.show_stats).grid(row=0, column=2, padx=5)
+        self.translated(ttk.Button(button_frame, command=self.show_stats), "ui.view_stats").grid(row=0, column=2, padx=5)
         
-        ttk.Button(button_frame, text=_("ui.clear_log"), 
-                  command=self.clear_log).grid(row=0, column=3, padx=5)
+        self.translated(ttk.Button(button_frame, command=self.clear_log), "ui.clear_log").grid(row=0, column=3, padx=5)
         
     def setup_history_tab(self):
         """Pull history tab"""
@@ -494,44 +687,50 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         controls_frame = ttk.Frame(self.history_tab)
         controls_frame.grid(row=0, column=0, sticky='ew', pady=(0, 10))
         
-        # BANNER FILTER
-        ttk.Label(controls_frame, text=_("ui.banner_filter")).pack(side='left', padx=(0, 5))
-        self.banner_filter = ttk.Combobox(controls_frame, 
-                                         values=[_("filters.all"), _("banners.characters"), _("banners.weapons"), 
-                                                _("banners.permanent"), _("banners.beginner"), _("banners.mystery_box"), 
-                                                _("banners.special"), _("banners.event")], 
-                                         width=12)
-        self.banner_filter.set(_("filters.all"))
+        # BANNER FILTER (each option maps to the banner family codes it shows)
+        # "Characters" shows both "Promotional" and "Characters" banners
+        self.banner_filter_families = [
+            None, {BANNER_CHARACTERS, BANNER_PROMOTIONAL}, {BANNER_WEAPONS}, {BANNER_PERMANENT}, 
+            {BANNER_BEGINNER}, {BANNER_MYSTERY_BOX}, {BANNER_SPECIAL}, {BANNER_EVENT}
+        ]
+        self.translated(ttk.Label(controls_frame), "ui.banner_filter").pack(side='left', padx=(0, 5))
+        self.banner_filter = self.translated_choices(ttk.Combobox(controls_frame, width=12), 
+                                                     ["filters.all", "banners.characters", "banners.weapons", 
+                                                      "banners.permanent", "banners.beginner", "banners.mystery_box", 
+                                                      "banners.special", "banners.event"])
+        self.banner_filter.current(0)
         self.banner_filter.pack(side='left', padx=(0, 15))
         self.banner_filter.bind('<<ComboboxSelected>>', self.apply_filters)
         
-        # TYPE FILTER
-        ttk.Label(controls_frame, text=_("ui.type_filter")).pack(side='left', padx=(0, 5))
-        self.type_filter = ttk.Combobox(controls_frame, 
-                                       values=[_("filters.all"), _("filters.characters"), _("filters.weapons"), _("filters.items")], 
-                                       width=8)
-        self.type_filter.set(_("filters.all"))
+        # TYPE FILTER (options in the same order as their item type codes)
+        self.type_filter_codes = [None, ITEM_CHARACTER, ITEM_WEAPON, ITEM_MBOX]
+        self.translated(ttk.Label(controls_frame), "ui.type_filter").pack(side='left', padx=(0, 5))
+        self.type_filter = self.translated_choices(ttk.Combobox(controls_frame, width=8), 
+                                                   ["filters.all", "filters.characters", "filters.weapons", "filters.items"])
+        self.type_filter.current(0)
         self.type_filter.pack(side='left', padx=(0, 15))
         self.type_filter.bind('<<ComboboxSelected>>', self.apply_filters)
         
         # RARITY FILTER
-        ttk.Label(controls_frame, text=_("ui.rarity_filter")).pack(side='left', padx=(0, 5))
-        self.rarity_filter = ttk.Combobox(controls_frame, 
-                                         values=[_("filters.all_rarities"), _("filters.3_star"), _("filters.4_star"), _("filters.5_star")], 
-                                         width=8)
-        self.rarity_filter.set(_("filters.all_rarities"))
+        self.rarity_filter_values = [None, 3, 4, 5]
+        self.translated(ttk.Label(controls_frame), "ui.rarity_filter").pack(side='left', padx=(0, 5))
+        self.rarity_filter = self.translated_choices(ttk.Combobox(controls_frame, width=8), 
+                                                     ["filters.all_rarities", "filters.3_star", "filters.4_star", "filters.5_star"])
+        self.rarity_filter.current(0)
         self.rarity_filter.pack(side='left', padx=(0, 15))
         self.rarity_filter.bind('<<ComboboxSelected>>', self.apply_filters)
         
         # Text search
-        ttk.Label(controls_frame, text=_("ui.search")).pack(side='left', padx=(0, 5))
+        self.translated(ttk.Label(controls_frame), "ui.search").pack(side='left', padx=(0, 5))
         self.search_entry = ttk.Entry(controls_frame, width=20)
         self.search_entry.pack(side='left', padx=(0, 15))
         self.search_entry.bind('<KeyRelease>', self.apply_filters)
+        self.search_autocomplete = SearchAutocomplete(self.search_entry, self.suggest_item_names,
+                                                      lambda name: self.apply_filters())
         
         # Buttons
-        ttk.Button(controls_frame, text=_("ui.refresh"), command=self.load_history).pack(side='left', padx=(0, 10))
-        ttk.Button(controls_frame, text=_("ui.clear_filters"), command=self.clear_filters).pack(side='left')
+        self.translated(ttk.Button(controls_frame, command=self.load_history), "ui.refresh").pack(side='left', padx=(0, 10))
+        self.translated(ttk.Button(controls_frame, command=self.clear_filters), "ui.clear_filters").pack(side='left')
         
         tree_frame = ttk.Frame(self.history_tab)
         tree_frame.grid(row=1, column=0, sticky='nsew')
@@ -544,16 +743,25 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         self.history_tree = ttk.Treeview(tree_frame, columns=columns, show='headings', height=25)
         
         column_widths = {'Date': 100, 'Time': 80, _("ui.banner_filter"): 120, 'Item': 250, _("ui.type_filter"): 80, _("ui.rarity_filter"): 70}
-        for col in columns:
-            self.history_tree.heading(col, text=col)
+        self.history_heading_keys = {columns[2]: "ui.banner_filter", columns[4]: "ui.type_filter",
+                                     columns[5]: "ui.rarity_filter"}
+        for index, col in enumerate(columns):
+            self.history_tree.heading(col, text=col, command=lambda column=index: self.sort_history(column))
             self.history_tree.column(col, width=column_widths.get(col, 100))
         
-        scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.history_tree.yview)
-        self.history_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(tree_frame, orient='vertical')
         
         self.history_tree.grid(row=0, column=0, sticky='nsew')
         scrollbar.grid(row=0, column=1, sticky='ns')
         
+        # Alternating backgrounds so consecutive multis stay distinguishable
+        self.history_tree.tag_configure('multi_even', background='#EAF4FB')
+        self.history_tree.tag_configure('multi_odd', background='#FDF3E1')
+        
+        # Only the rows on screen exist in the Treeview; the scrollbar maps to record offsets
+        self.history_view = VirtualHistoryView(self.history_tree, scrollbar,
+                                               self.format_history_position, self.get_multi_tags)
+        
     def setup_stats_tab(self):
         """Statistics tab"""
         self.stats_tab = ttk.Frame(self.notebook)
@@ -570,7 +778,7 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         main_frame.grid_columnconfigure(0, weight=1)
         main_frame.grid_columnconfigure(1, weight=1)
         
-        text_frame = ttk.LabelFrame(main_frame, text=_("ui.detailed_stats"), padding=10)
+        text_frame = self.translated(ttk.LabelFrame(main_frame, padding=10), "ui.detailed_stats")
         text_frame.grid(row=0, column=0, sticky='nsew', padx=(0, 5))
         text_frame.grid_rowconfigure(0, weight=1)
         text_frame.grid_columnconfigure(0, weight=1)
@@ -579,7 +787,7 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
                                                    font=('Arial', 9), wrap=tk.WORD)
         self.stats_text.grid(row=0, column=0, sticky='nsew')
         
-        graph_frame = ttk.LabelFrame(main_frame, text=_("ui.banner_distribution"), padding=10)
+        graph_frame = self.translated(ttk.LabelFrame(main_frame, padding=10), "ui.banner_distribution")
         graph_frame.grid(row=0, column=1, sticky='nsew', padx=(5, 0))
         
         graph_frame.grid_rowconfigure(0, weight=1)
@@ -600,8 +808,96 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         self.legend_frame.grid(row=1, column=0, sticky='ew', padx=5, pady=(0, 5))
         self.legend_frame.grid_columnconfigure(0, weight=1)
         
-        ttk.Button(main_frame, text=_("ui.update_stats"), 
-                  command=self.update_stats_display).grid(row=1, column=0, columnspan=2, pady=10)
+        # Resizes only move the existing slices; see PieChart
+        self.pie_chart = PieChart(self.pie_canvas, self.legend_frame, lambda: _("messages.no_data"))
+        
+        self.translated(ttk.Button(main_frame, command=self.update_stats_display), "ui.update_stats").grid(row=1, column=0, columnspan=2, pady=10)
+        
+    def setup_planner_tab(self):
+        """Pull planner tab"""
+        self.planner_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.planner_tab, text=_("ui.planner_tab"))
+        
+        self.planner_tab.grid_rowconfigure(1, weight=1)
+        self.planner_tab.grid_columnconfigure(0, weight=1)
+        
+        input_frame = self.translated(ttk.LabelFrame(self.planner_tab, padding=15), "ui.planner_title")
+        input_frame.grid(row=0, column=0, sticky='ew', pady=(0, 10))
+        
+        # One option per rule set, in RULE_SETS order, named after the banner family it covers
+        rule_families = {rule: family for family, rule in RULE_SET_FAMILIES.items()}
+        self.translated(ttk.Label(input_frame), "ui.planner_banner").grid(row=0, column=0, sticky='w', pady=4)
+        self.planner_banner = self.translated_choices(ttk.Combobox(input_frame, state='readonly', width=15), 
+                                                      [f"banners.{BANNER_FAMILY_KEYS[rule_families[rule]]}" 
+                                                       for rule in RULE_SETS])
+        self.planner_banner.current(0)
+        self.planner_banner.grid(row=0, column=1, sticky='w', padx=10, pady=4)
+        self.planner_banner.bind('<<ComboboxSelected>>', lambda e: self.refresh_planner_pity())
+        
+        self.translated(ttk.Label(input_frame), "ui.planner_copies").grid(row=1, column=0, sticky='w', pady=4)
+        self.planner_copies = ttk.Spinbox(input_frame, from_=1, to=7, width=8)
+        self.planner_copies.set(1)
+        self.planner_copies.grid(row=1, column=1, sticky='w', padx=10, pady=4)
+        
+        self.translated(ttk.Label(input_frame), "ui.planner_pity").grid(row=2, column=0, sticky='w', pady=4)
+        self.planner_pity = ttk.Spinbox(input_frame, from_=0, to=79, width=8)
+        self.planner_pity.set(0)
+        self.planner_pity.grid(row=2, column=1, sticky='w', padx=10, pady=4)
+        self.translated(ttk.Button(input_frame, command=self.refresh_planner_pity), "ui.planner_from_history").grid(row=2, column=2, sticky='w', pady=4)
+        
+        self.planner_guaranteed = tk.BooleanVar(value=False)
+        self.translated(ttk.Checkbutton(input_frame, variable=self.planner_guaranteed), "ui.planner_guaranteed").grid(row=3, column=0, columnspan=3, sticky='w', pady=4)
+        
+        self.translated(ttk.Label(input_frame), "ui.planner_budget").grid(row=4, column=0, sticky='w', pady=4)
+        self.planner_budget = ttk.Entry(input_frame, width=10)
+        self.planner_budget.grid(row=4, column=1, sticky='w', padx=10, pady=4)
+        
+        self.translated(ttk.Button(input_frame, command=self.calculate_plan), "ui.planner_calculate").grid(row=5, column=0, columnspan=3, pady=(10, 0))
+        
+        self.planner_text = scrolledtext.ScrolledText(self.planner_tab, height=12, state='disabled', 
+                                                     font=('Consolas', 10), wrap=tk.WORD)
+        self.planner_text.grid(row=1, column=0, sticky='nsew')
+        
+    def refresh_planner_pity(self):
+        """Fills the pity field from the cached history results"""
+        if self.history_loading:
+            return
+        rule_name = RULE_SETS[max(self.planner_banner.current(), 0)]
+        pity = self.backup.get_derived()['pity'].get(rule_name, 0)
+        self.planner_pity.set(pity)
+        
+    def calculate_plan(self):
+        """Computes the exact pull distribution for the planner target"""
+        rule_name = RULE_SETS[max(self.planner_banner.current(), 0)]
+        try:
+            copies = int(self.planner_copies.get())
+            pity = int(self.planner_pity.get())
+            budget_str = self.planner_budget.get().strip()
+            budget = int(budget_str) if budget_str else None
+            if copies < 1 or pity < 0 or (budget is not None and budget < 0):
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Please enter valid positive numbers")
+            return
+        
+        summary = get_planner(rule_name).plan(copies=copies, pity=pity, 
+                                              guaranteed=self.planner_guaranteed.get(), budget=budget)
+        
+        result_text = f"""🎯 {self.planner_banner.get()} x{copies}
+
+• Expected pulls: {summary['expected']:.1f} (± {summary['std_dev']:.1f})
+• Worst case: {summary['worst_case']} pulls
+
+"""
+        for percentile, pulls in summary['percentiles'].items():
+            result_text += f"   • {int(percentile * 100)}% chance within {pulls} pulls\n"
+        if budget is not None:
+            result_text += f"\n• Chance with {budget} pulls: {summary['success_probability'] * 100:.2f}%\n"
+        
+        self.planner_text.config(state='normal')
+        self.planner_text.delete('1.0', 'end')
+        self.planner_text.insert('1.0', result_text)
+        self.planner_text.config(state='disabled')
         
     def setup_status_bar(self):
         """Bottom status bar"""
@@ -611,8 +907,8 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         self.status_label = ttk.Label(self.status_frame, text=_("ui.ready"))
         self.status_label.pack(side='left', padx=5)
         
-        stats = self.backup.get_statistics()
-        self.record_count_label = ttk.Label(self.status_frame, text=_(f"ui.pulls").format(count=stats['total_records']))
+        # Filled in by the startup load; the backup is never read on the Tk thread here
+        self.record_count_label = ttk.Label(self.status_frame, text="⏳")
         self.record_count_label.pack(side='right', padx=5)
         
     def get_rarity_display(self, rarity):
@@ -626,79 +922,123 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
                 return code
         return "darkwinter"
         
-    def get_item_type_display(self, item_id):
-        """Determines item type based on dictionaries"""
-        if item_id in self.dolls_data:
-            return _("filters.characters")
-        elif item_id in self.weapons_data:
-            return _("filters.weapons")
-        elif item_id in self.mbox_data:
-            return _("filters.items")
+    def get_item_type_labels(self):
+        """Translated type label for each item type code"""
+        return {
+            ITEM_CHARACTER: _("filters.characters"),
+            ITEM_WEAPON: _("filters.weapons"),
+            ITEM_MBOX: _("filters.items")
+        }
+        
+    def get_row_context(self):
+        """Lookup tables used to format history rows in the current language
+        
+        Built on the first row formatted after a language switch or a reload
+        of the reference data, then shared by every row.
+        """
+        if self.row_context is None:
+            self.row_context = (ItemResolver.get_table(), self.get_item_type_labels(),
+                                BannerClassifier.get_mapping(), BannerClassifier.get_labels())
+        return self.row_context
+        
+    def clear_row_cache(self):
+        """Drops the formatted rows and their lookup tables"""
+        self.row_cache.clear()
+        self.row_context = None
+        
+    def format_history_row(self, record, context):
+        """Treeview values of a record: date, time, banner, name, type, rarity"""
+        item_table, type_labels, banner_mapping, banner_labels = context
+        date_text, time_text = format_timestamp(record['time'])
+        banner_name = banner_labels[banner_mapping.get(record['pool_id'], BANNER_PROMOTIONAL)]
+        item_name, rarity, type_code = item_table.get(record['item']) or ItemResolver.unknown(record['item'])
+        return (date_text, time_text, banner_name, item_name,
+                type_labels.get(type_code, "Unknown"), self.get_rarity_display(rarity))
+        
+    def format_history_position(self, position):
+        """Treeview values of the record at a position of all_records"""
+        return self.row_cache.get(self.all_records[position])
+        
+    def get_multi_tags(self, position):
+        """Treeview tags for the record at a position of the multi index"""
+        multi_number = self.multi_index.multi_of(position) if self.multi_index else -1
+        if multi_number < 0:
+            return ()
+        return ('multi_even',) if multi_number % 2 == 0 else ('multi_odd',)
+        
+    def build_filter_columns(self, records):
+        """Precomputed banner/type/rarity/item columns and bitsets used by the filters"""
+        return HistoryColumns(records, ItemResolver.get_table(), BannerClassifier.get_mapping())
+        
+    def update_filter_columns(self, previous_records, records):
+        """Filter index for freshly loaded records, extending the current one when only newer pulls were added"""
+        added = len(records) - len(previous_records)
+        if self.filter_columns is not None and previous_records and added >= 0 and records[added:] == previous_records:
+            newer = records[:added]
+            self.item_counts.update(record['item'] for record in newer)
+            return self.filter_columns.with_newer(self.build_filter_columns(newer))
+        self.item_counts = Counter(record['item'] for record in records)
+        return self.build_filter_columns(records)
+        
+    def suggest_item_names(self, text):
+        """Item names completing the search text, most pulled first"""
+        trie = get_name_trie(ItemResolver.get_table(), self.current_language)
+        return trie.complete(text, self.item_counts)
+        
+    def apply_filters(self, event=None, keep_offset=False):
+        """Applies search, banner, type and rarity filters (evaluated in the background)
+        
+        `keep_offset` is for refreshes of the same query (new pulls, reloaded
+        data): the History stays scrolled at the same record instead of going
+        back to the top.
+        """
+        if not self.all_records or self.filter_columns is None:
+            return
+        self.history_keep_offset = keep_offset
+        
+        selected_banner = self.banner_filter.current()
+        selected_type = self.type_filter.current()
+        selected_rarity = self.rarity_filter.current()
+        query = FilterQuery(
+            families=self.banner_filter_families[selected_banner] if selected_banner >= 0 else None,
+            type_code=self.type_filter_codes[selected_type] if selected_type >= 0 else None,
+            rarity=self.rarity_filter_values[selected_rarity] if selected_rarity >= 0 else None,
+            text=self.search_entry.get(),
+            item_table=ItemResolver.get_table(),
+            language=self.current_language,
+            sort=self.history_sort,
+            banner_labels=BannerClassifier.get_labels(),
+            type_labels=self.get_item_type_labels()
+        )
+        
+        # Typing waits for a pause; dropdowns and buttons filter right away
+        debounce = event is not None and event.widget is self.search_entry
+        self.history_filter.request(self.filter_columns, query, debounce)
+        
+    def sort_history(self, column):
+        """Heading click: ascending, then descending, then back to newest first"""
+        if self.history_sort is None or self.history_sort[0] != column:
+            self.history_sort = (column, False)
+        elif not self.history_sort[1]:
+            self.history_sort = (column, True)
         else:
-            return "Unknown"
+            self.history_sort = None
+        self.update_sort_headings()
+        self.apply_filters()
+        
+    def update_sort_headings(self):
+        """Marks the sorted History column with an arrow"""
+        for index, column in enumerate(self.history_tree['columns']):
+            text = self.history_tree.heading(column, 'text').rstrip(' ▲▼')
+            if self.history_sort is not None and self.history_sort[0] == index:
+                text += " ▼" if self.history_sort[1] else " ▲"
+            self.history_tree.heading(column, text=text)
+        
+    def show_filter_results(self, matches):
+        """Receives the positions that passed the filters (on the Tk thread)"""
+        self.history_view.set_rows(matches, keep_offset=self.history_keep_offset)
+        filtered_count = len(matches)
         
-    def apply_filters(self, event=None):
-        """Applies search, banner, type and rarity filters"""
-        if not self.all_records:
-            return
-            
-        search_text = self.search_entry.get().lower()
-        selected_banner = self.banner_filter.get()
-        selected_type = self.type_filter.get()
-        selected_rarity = self.rarity_filter.get()
-        
-        # Clear current table
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-            
-        filtered_count = 0
-        for record in self.all_records:
-            # Get record information
-            banner_name = get_banner_name(record['pool_id'])
-            item_name, rarity = get_item_name(record['item'])
-            item_type = self.get_item_type_display(record['item'])
-            rarity_display = self.get_rarity_display(rarity)
-            
-            # BANNER FILTER
-            if selected_banner != _("filters.all"):
-                # Handle special case of "Promotional" vs "Characters"
-                if selected_banner == _("banners.characters"):
-                    # For "Characters" filter, show both "Promotional" and "Characters"
-                    if banner_name not in [_("banners.promotional"), _("banners.characters")]:
-                        continue
-                elif selected_banner != banner_name:
-                    continue
-                        
-            # TYPE FILTER
-            if selected_type != _("filters.all"):
-                if selected_type == _("filters.characters") and item_type != _("filters.characters"):
-                    continue
-                elif selected_type == _("filters.weapons") and item_type != _("filters.weapons"):
-                    continue
-                elif selected_type == _("filters.items") and item_type != _("filters.items"):
-                    continue
-                
-            # RARITY FILTER
-            if selected_rarity != _("filters.all_rarities"):
-                rarity_map = {_("filters.3_star"): 3, _("filters.4_star"): 4, _("filters.5_star"): 5}
-                target_rarity = rarity_map.get(selected_rarity)
-                if rarity != target_rarity:
-                    continue
-                
-            # Filter by text search
-            if search_text and search_text not in item_name.lower():
-                continue
-                
-            # If it passes filters, add to table
-            dt = datetime.fromtimestamp(record['time'])
-            date_str = dt.strftime("%Y-%m-%d")
-            time_str = dt.strftime("%H:%M:%S")
-            
-            self.history_tree.insert('', 'end', values=(
-                date_str, time_str, banner_name, item_name, item_type, rarity_display
-            ))
-            filtered_count += 1
-            
         # Update status bar
         current_tab = self.notebook.tab(self.notebook.select(), "text")
         if current_tab == _("ui.history_tab"):
@@ -711,152 +1051,79 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
     def clear_filters(self):
         """Clears all filters and shows all records"""
         self.search_entry.delete(0, 'end')
-        self.banner_filter.set(_("filters.all"))
-        self.type_filter.set(_("filters.all"))
-        self.rarity_filter.set(_("filters.all_rarities"))
+        self.banner_filter.current(0)
+        self.type_filter.current(0)
+        self.rarity_filter.current(0)
         self.apply_filters()
         
-    def _draw_no_data_message(self):
-        """Draws no data message on canvas"""
-        canvas_width = self.pie_canvas.winfo_width()
-        canvas_height = self.pie_canvas.winfo_height()
-        
-        if canvas_width > 10 and canvas_height > 10:
-            self.pie_canvas.delete("all")
-            self.pie_canvas.create_text(
-                canvas_width // 2, canvas_height // 2,
-                text=_(f"messages.no_data"), 
-                font=('Arial', 12), fill='gray', justify='center'
-            )
-        
     def create_pie_chart(self, stats):
-        """Creates a pie chart using tkinter Canvas"""
-        self.pie_canvas.delete("all")
-        for widget in self.legend_frame.winfo_children():
-            widget.destroy()
-            
+        """Shows the banner distribution of the given statistics in the pie chart"""
         if not stats['banners'] or stats['total_records'] == 0:
-            self.root.after(100, self._draw_no_data_message)
-            return
-        
-        banner_groups = {}
-        for banner_id, count in stats['banners'].items():
-            banner_name = get_banner_name(banner_id)
-            if banner_name in banner_groups:
-                banner_groups[banner_name] += count
-            else:
-                banner_groups[banner_name] = count
-        
-        banners = list(banner_groups.keys())
-        counts = list(banner_groups.values())
-        total = sum(counts)
-        
-        self.pie_canvas.update_idletasks()
-        canvas_width = self.pie_canvas.winfo_width()
-        canvas_height = self.pie_canvas.winfo_height()
-        
-        if canvas_width < 50 or canvas_height < 50:
-            container_width = self.graph_container.winfo_width()
-            container_height = self.graph_container.winfo_height()
-            
-            if container_width > 50 and container_height > 50:
-                canvas_width = container_width - 20
-                canvas_height = container_height - 20
-            else:
-                canvas_width = 200
-                canvas_height = 200
-        
-        center_x = canvas_width // 2
-        center_y = canvas_height // 2
-        radius = min(center_x, center_y) - 30
-        
-        if radius < 10:
-            radius = min(canvas_width, canvas_height) // 3
-        
-        colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57', '#FF9FF3', '#54A0FF']
-        
-        if len(banners) == 1:
-            banner_name = banners[0]
-            count = counts[0]
-            
-            self.pie_canvas.create_oval(
-                center_x - radius, center_y - radius,
-                center_x + radius, center_y + radius,
-                fill=colors[0], outline='white', width=2
-            )
-            
-            font_size = max(10, min(14, radius // 10))
-            self.pie_canvas.create_text(
-                center_x, center_y,
-                text=f"100%\n{banner_name}",
-                font=('Arial', font_size, 'bold'),
-                fill='white',
-                justify='center'
-            )
-            
+            self.pie_chart.set_data({})
         else:
-            start_angle = 0
-            for i, count in enumerate(counts):
-                percentage = (count / total) * 100
-                angle = 360 * (count / total)
-                
-                if angle > 0:
-                    self.pie_canvas.create_arc(
-                        center_x - radius, center_y - radius,
-                        center_x + radius, center_y + radius,
-                        start=start_angle, extent=angle,
-                        fill=colors[i % len(colors)], 
-                        outline='white', 
-                        width=1,
-                        style=tk.PIESLICE
-                    )
-                    
-                    if angle > 15 and radius > 30:
-                        mid_angle = start_angle + angle / 2
-                        mid_angle_rad = math.radians(mid_angle)
-                        label_x = center_x + (radius * 0.7) * math.cos(mid_angle_rad)
-                        label_y = center_y + (radius * 0.7) * math.sin(mid_angle_rad)
-                        
-                        font_size = max(8, min(12, radius // 15))
-                        self.pie_canvas.create_text(
-                            label_x, label_y, 
-                            text=f"{percentage:.1f}%", 
-                            font=('Arial', font_size, 'bold'), 
-                            fill='white'
-                        )
-                    
-                    start_angle += angle
-        
-        for i, (banner, count) in enumerate(zip(banners, counts)):
-            percentage = (count / total) * 100
-            
-            legend_item_frame = ttk.Frame(self.legend_frame)
-            legend_item_frame.pack(fill='x', padx=5, pady=1)
-            
-            color_canvas = tk.Canvas(legend_item_frame, width=16, height=16, highlightthickness=0)
-            color_canvas.pack(side='left', padx=(0, 5))
-            color_canvas.create_rectangle(2, 2, 14, 14, fill=colors[i % len(colors)], outline='#666666')
-            
-            legend_text = f"{banner}: {count} ({percentage:.1f}%)"
-            legend_label = ttk.Label(legend_item_frame, text=legend_text, font=('Arial', 8))
-            legend_label.pack(side='left', fill='x', expand=True)
+            self.pie_chart.set_data(self.backup.get_banner_groups())
         
-        self.pie_canvas.update_idletasks()
+    def get_log_settings(self):
+        """(lines kept in the import log, rotating log file or None) from the configuration"""
+        max_lines = ConfigManager.get_setting('log_max_lines', 1000)
+        log_file = IMPORT_LOG_FILE if ConfigManager.get_setting('log_to_file', False) else None
+        return max_lines, log_file
         
     def log_message(self, message):
-        """Adds message to import log"""
-        self.import_log.config(state='normal')
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.import_log.insert('end', f"[{timestamp}] {message}\n")
-        self.import_log.see('end')
-        self.import_log.config(state='disabled')
-        self.root.update_idletasks()
+        """Adds message to import log (safe from any thread)"""
+        self.import_log_channel.write(message)
         
     def clear_log(self):
         """Clears import log"""
-        self.import_log.config(state='normal')
-        self.import_log.delete('1.0', 'end')
-        self.import_log.config(state='disabled')
+        self.import_log_channel.clear()
+        
+    def reset_import_progress(self):
+        """Empties the per-banner progress bars"""
+        for bar, detail_label in self.progress_rows.values():
+            if str(bar.cget('mode')) == 'indeterminate':
+                bar.stop()
+                bar.config(mode='determinate')
+            bar.config(value=0, maximum=1)
+            detail_label.config(text="")
+            
+    def stop_import_progress(self):
+        """Stops the bars of banners whose total was never known"""
+        for bar, detail_label in self.progress_rows.values():
+            if str(bar.cget('mode')) == 'indeterminate':
+                bar.stop()
+                
+    def on_import_progress(self, event):
+        """Progress event from the import thread"""
+        self.root.after(0, self.show_import_progress, event)
+        
+    def show_import_progress(self, event):
+        """Updates one banner's bar: pages, pulls, pages/s and ETA"""
+        bar, detail_label = self.progress_rows[event['type_id']]
+        expected_pages = event['expected_pages']
+        
+        if expected_pages is None:
+            # No previous import and no page limit: the total is unknown
+            if str(bar.cget('mode')) != 'indeterminate':
+                bar.config(mode='indeterminate')
+                bar.start()
+            parts = [f"{event['pages']} pages"]
+        else:
+            if str(bar.cget('mode')) == 'indeterminate':
+                bar.stop()
+                bar.config(mode='determinate')
+            bar.config(maximum=max(1, expected_pages), value=event['pages'])
+            parts = [f"{event['pages']}/{expected_pages} pages"]
+        parts.append(f"{event['pulls']} pulls")
+        
+        if event['finished']:
+            parts.append("done")
+        else:
+            if event['pages_per_second']:
+                parts.append(f"{event['pages_per_second']:.1f} pages/s")
+            if event['eta'] is not None:
+                minutes, seconds = divmod(int(round(event['eta'])), 60)
+                parts.append(f"ETA {minutes}:{seconds:02d}")
+        detail_label.config(text=" · ".join(parts))
         
     def start_import(self):
         """Starts import in a separate thread"""
@@ -876,7 +1143,7 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
             
         self.is_importing = True
         self.import_btn.config(state='disabled')
-        self.progress_bar.start()
+        self.reset_import_progress()
         self.clear_log()
         
         thread = threading.Thread(target=self.run_import, args=(token, email, server_code))
@@ -903,20 +1170,23 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
             stats = self.backup.get_statistics()
             self.log_message(f"📊 CURRENT STATUS: {stats['total_records']} pulls, {stats['multi_count']} multis")
             
-            type_ids_to_check = ['1', '3', '4', '5', '8']
+            progress = ImportProgress(IMPORT_TYPE_IDS, server_code, listener=self.on_import_progress)
             all_new_raw_records = []
             
-            for type_id in type_ids_to_check:
+            for type_id in IMPORT_TYPE_IDS:
                 self.log_message(f"🎯 Getting type_id {type_id}...")
-                records = get_all_pages_for_type(token, email, type_id, server_code, self.log_message)
+                records = get_all_pages_for_type(token, email, type_id, server_code, self.log_message, progress)
                 if records:
                     all_new_raw_records.extend(records)
                     self.log_message(f"   ✅ {len(records)} pulls obtained")
                 else:
                     self.log_message(f"   ℹ️  No data")
+            # Page counts of this import are the estimate for the next one
+            progress.save_history()
             
             if all_new_raw_records:
-                added_count = self.backup.add_new_records(all_new_raw_records)
+                added_records = self.backup.add_new_records(all_new_raw_records)
+                added_count = len(added_records)
                 
                 self.log_message(f"\n📊 FINAL RESULT:")
                 self.log_message(f"   Server pulls: {len(all_new_raw_records)}")
@@ -935,12 +1205,14 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
             
     def on_import_success(self, added_count):
         """When import finishes successfully"""
-        self.progress_bar.stop()
+        self.stop_import_progress()
         self.import_btn.config(state='normal')
         self.is_importing = False
         
+        # The backup already updated its index and statistics with the new pulls
         self.update_status_bar()
-        self.load_history()
+        self.show_added_records(added_count)
+        self.refresh_planner_pity()
         self.update_stats_display()
         
         self.status_label.config(text=_(f"messages.import_success").format(count=added_count))
@@ -949,7 +1221,7 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         
     def on_import_finished(self):
         """When import finishes without new data"""
-        self.progress_bar.stop()
+        self.stop_import_progress()
         self.import_btn.config(state='normal')
         self.is_importing = False
         self.update_status_bar()
@@ -957,7 +1229,7 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         
     def on_import_error(self, error_msg):
         """When an error occurs during import"""
-        self.progress_bar.stop()
+        self.stop_import_progress()
         self.import_btn.config(state='normal')
         self.is_importing = False
         self.status_label.config(text=_("messages.import_error"))
@@ -965,56 +1237,74 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
         
     def update_status_bar(self):
         """Updates status bar with current information"""
+        # Statistics are still being computed by the startup load
+        if self.history_loading:
+            return
         stats = self.backup.get_statistics()
         self.record_count_label.config(text=_(f"ui.pulls").format(count=stats['total_records']))
         self.status_label.config(text=_("ui.ready"))
         
     def load_history(self):
         """Loads history into the table"""
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-            
         try:
-            records = self.backup.get_all_records()
-            self.all_records = records.copy()
-            
-            records.sort(key=lambda x: x['time'], reverse=True)
-            
-            for record in records[:1000]:
-                dt = datetime.fromtimestamp(record['time'])
-                date_str = dt.strftime("%Y-%m-%d")
-                time_str = dt.strftime("%H:%M:%S")
-                banner_name = get_banner_name(record['pool_id'])
-                item_name, rarity = get_item_name(record['item'])
-                item_type = self.get_item_type_display(record['item'])
-                rarity_display = self.get_rarity_display(rarity)
-                
-                self.history_tree.insert('', 'end', values=(
-                    date_str, time_str, banner_name, item_name, item_type, rarity_display
-                ))
-            
+            index = self.backup.get_multi_index()
+            self.filter_columns = self.update_filter_columns(self.all_records, index.records)
             self.update_status_bar()
-            
-            current_tab = self.notebook.tab(self.notebook.select(), "text")
-            if current_tab == _("ui.history_tab"):
-                total_count = len(records)
-                self.status_label.config(text=_(f"messages.showing_all").format(count=total_count))
+            self.refresh_planner_pity()
+            self.show_history(index)
             
         except Exception as e:
             print(f"Error loading history: {e}")
             
+    def show_added_records(self, added_count):
+        """Puts the pulls added by an import at the top of the History tab
+        
+        Only the new records are indexed for the filters; the rows already
+        loaded just move down. Falls back to a full reload when the new pulls
+        are not all newer than the loaded history.
+        """
+        index = self.backup.get_multi_index()
+        previous_records = self.all_records
+        if not previous_records or index.records[added_count:] != previous_records:
+            self.load_history()
+            return
+        
+        self.filter_columns = self.update_filter_columns(previous_records, index.records)
+        self.multi_index = index
+        self.all_records = index.records
+        self.history_filter.cancel()
+        
+        if self.history_query_active():
+            # Shown rows keep pointing at their records until the filter result arrives
+            shifted = array('I', [position + added_count for position in self.history_view.rows])
+            self.history_view.insert_at_top(added_count, shifted)
+            self.apply_filters(keep_offset=True)
+        else:
+            self.history_view.insert_at_top(added_count, range(len(index.records)))
+            current_tab = self.notebook.tab(self.notebook.select(), "text")
+            if current_tab == _("ui.history_tab"):
+                self.status_label.config(text=_(f"messages.showing_all").format(count=len(index.records)))
+        
+    def show_history(self, index):
+        """Shows a decoded history (multi index) in the table, newest first"""
+        self.multi_index = index
+        self.all_records = index.records
+        
+        # The whole history is scrollable; only the visible rows are rendered
+        self.history_filter.cancel()
+        self.history_view.set_rows(range(len(index.records)))
+        
+        current_tab = self.notebook.tab(self.notebook.select(), "text")
+        if current_tab == _("ui.history_tab"):
+            self.status_label.config(text=_(f"messages.showing_all").format(count=len(index.records)))
+            
     def update_stats_display(self):
         """Updates the statistics tab"""
+        if self.history_loading:
+            return
         stats = self.backup.get_statistics()
-        self.current_stats = stats
         
-        banner_groups = {}
-        for banner_id, count in stats['banners'].items():
-            banner_name = get_banner_name(banner_id)
-            if banner_name in banner_groups:
-                banner_groups[banner_name] += count
-            else:
-                banner_groups[banner_name] = count
+        banner_groups = self.backup.get_banner_groups()
         
         stats_text = f"""📊 HISTORY STATISTICS
 
@@ -1036,25 +1326,28 @@ or the "Girl's Frontline 2: Exilium" game. This is a community fan project.
                 stats_text += f"   • {banner_name}: {count} pulls ({percentage:.1f}%)\n"
         else:
             stats_text += "   No banner data\n"
+        
+        rarities = self.backup.get_derived()['rollups']['rarities']
+        if rarities:
+            stats_text += "\n⭐ RARITY BREAKDOWN:\n"
+            total_pulls = stats['total_records']
+            for rarity in sorted(rarities, reverse=True):
+                count = rarities[rarity]
+                percentage = (count / total_pulls) * 100 if total_pulls > 0 else 0
+                stats_text += f"   • {self.get_rarity_display(rarity)}: {count} pulls ({percentage:.2f}%)\n"
             
         self.stats_text.config(state='normal')
         self.stats_text.delete('1.0', 'end')
         self.stats_text.insert('1.0', stats_text)
         self.stats_text.config(state='disabled')
         
-        self.root.after(100, lambda: self.create_pie_chart(stats))
+        self.create_pie_chart(stats)
         
     def show_stats(self):
         """Shows quick statistics in a messagebox"""
         stats = self.backup.get_statistics()
         
-        banner_groups = {}
-        for banner_id, count in stats['banners'].items():
-            banner_name = get_banner_name(banner_id)
-            if banner_name in banner_groups:
-                banner_groups[banner_name] += count
-            else:
-                banner_groups[banner_name] = count
+        banner_groups = self.backup.get_banner_groups()
         
         stats_text = f"📊 QUICK STATISTICS\n\n"
         stats_text += f"Total pulls: {stats['total_records']}\n"
@@ -0,0 +1,146 @@
+from collections import Counter
+
+# Queries shorter than this never fall back to typo-tolerant matching
+FUZZY_MIN_LENGTH = 4
+
+
+def trigrams(text):
+    """Distinct 3-character substrings of a text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def substring_distance(pattern, text):
+    """Fewest edits that turn `pattern` into some substring of `text`"""
+    previous = [0] * (len(text) + 1)
+    for i, pattern_char in enumerate(pattern, 1):
+        current = [i] + [0] * len(text)
+        for j, text_char in enumerate(text, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (pattern_char != text_char))
+        previous = current
+    return min(previous)
+
+
+class NameIndex:
+    """Trigram index over the distinct localized item names of one language
+
+    Each trigram of a lowercased name points to the item IDs whose name
+    contains it. A substring query intersects the postings of its own
+    trigrams, so only names that can match are compared. When nothing
+    matches exactly, names sharing enough trigrams are checked with an edit
+    distance that tolerates one typo (two for long queries).
+    """
+
+    def __init__(self, item_table):
+        self.names = {}
+        self.postings = {}
+        for item_id, (name, _rarity, _type_code) in item_table.items():
+            lowered = name.lower()
+            self.names[item_id] = lowered
+            for gram in trigrams(lowered):
+                self.postings.setdefault(gram, set()).add(item_id)
+
+    def substring(self, text, within=None):
+        """Item IDs whose name contains `text`"""
+        grams = trigrams(text)
+        if grams:
+            postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        else:
+            # One or two characters: too short for trigrams, check every name
+            candidates = self.names.keys()
+        if within is not None:
+            candidates = [item_id for item_id in candidates if item_id in within]
+        return {item_id for item_id in candidates if text in self.names[item_id]}
+
+    def fuzzy(self, text, within=None, max_typos=None):
+        """Item IDs whose name contains `text` with at most `max_typos` edits"""
+        if max_typos is None:
+            max_typos = 1 if len(text) < 8 else 2
+        grams = trigrams(text)
+        # Every edit destroys at most three of the query's trigrams
+        required = max(1, len(grams) - 3 * max_typos)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        matches = set()
+        for item_id, count in shared.items():
+            if count < required or (within is not None and item_id not in within):
+                continue
+            if substring_distance(text, self.names[item_id]) <= max_typos:
+                matches.add(item_id)
+        return matches
+
+    def search(self, text, within=None):
+        """Exact substring matches, or typo-tolerant ones if there are none"""
+        text = text.lower()
+        matches = self.substring(text, within)
+        if matches or len(text) < FUZZY_MIN_LENGTH:
+            return matches
+        return self.fuzzy(text, within)
+
+
+class NameTrie:
+    """Prefix trie over the localized item names of one language
+
+    Every name is inserted from its start and from the start of each later
+    word, so "boost" completes "Stock Boost Bar". Each node keeps the IDs of
+    all items below it, so a completion is a walk down the prefix plus a
+    sort of at most a few hundred candidates.
+    """
+
+    ITEMS = ''  # Node key holding the item IDs (never a single character)
+
+    def __init__(self, item_table):
+        self.root = {}
+        self.names = {}
+        for item_id, (name, _rarity, _type_code) in item_table.items():
+            self.names[item_id] = name
+            lowered = name.lower()
+            starts = [0] + [i + 1 for i, char in enumerate(lowered[:-1]) if char == ' ']
+            for start in starts:
+                node = self.root
+                for char in lowered[start:]:
+                    node = node.setdefault(char, {})
+                    node.setdefault(self.ITEMS, set()).add(item_id)
+
+    def complete(self, prefix, counts=None, limit=8):
+        """Names starting with `prefix` (at any word), most pulled first"""
+        node = self.root
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+        if node is self.root:
+            return []
+
+        # Items sharing a name are suggested once, with their counts added up
+        scores = {}
+        for item_id in node.get(self.ITEMS, ()):
+            name = self.names[item_id]
+            scores[name] = scores.get(name, 0) + (counts.get(item_id, 0) if counts else 0)
+        ranked = sorted(scores, key=lambda name: (-scores[name], name))
+        return ranked[:limit]
+
+
+_cache = {}  # (structure, language) -> (item table it was built from, structure)
+
+
+def _get_cached(factory, item_table, language):
+    key = (factory.__name__, language)
+    cached = _cache.get(key)
+    if cached is None or cached[0] is not item_table:
+        cached = (item_table, factory(item_table))
+        _cache[key] = cached
+    return cached[1]
+
+
+def get_name_index(item_table, language=None):
+    """Trigram index for an item resolution table, rebuilt only when the table is replaced"""
+    return _get_cached(NameIndex, item_table, language)
+
+
+def get_name_trie(item_table, language=None):
+    """Autocomplete trie for an item resolution table, rebuilt only when the table is replaced"""
+    return _get_cached(NameTrie, item_table, language)
@@ -0,0 +1,150 @@
+import math
+import tkinter as tk
+from tkinter import ttk
+
+PIE_COLORS = ('#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57', '#FF9FF3', '#54A0FF')
+
+
+class PieChart:
+    """Pie chart on a Canvas with its legend rows below
+
+    The slices (angles, colors, percentages) are computed once per data set
+    and their canvas items are created once; a resize only moves them with
+    `coords`. New data with the same counts (e.g. after a language switch)
+    only changes texts, and legend rows are reused and updated in place, so
+    neither resizing nor refreshing recreates widgets.
+    """
+
+    MIN_SIZE = 50
+
+    def __init__(self, canvas, legend_frame, empty_text, colors=PIE_COLORS):
+        self.canvas = canvas
+        self.legend_frame = legend_frame
+        self.empty_text = empty_text  # Callable, so the message follows the language
+        self.colors = colors
+
+        self.slices = None  # ((label, count, percentage, start, extent, color), ...)
+        self.items = []  # Per slice: (shape item, text item or None)
+        self.message_item = None
+        self.legend_rows = []  # (frame, swatch canvas, swatch rectangle, label)
+        self.legend_shown = []  # (text, color) currently in each legend row
+        self._layout_key = None
+
+        canvas.bind('<Configure>', lambda e: self.layout(), add='+')
+
+    def set_data(self, groups):
+        """Shows {label: count}; nothing is redrawn if the slices did not change"""
+        total = sum(groups.values())
+        slices = []
+        start = 0.0
+        for index, (label, count) in enumerate(groups.items() if total else ()):
+            extent = 360 * count / total
+            slices.append((label, count, count / total * 100, start, extent,
+                           self.colors[index % len(self.colors)]))
+            start += extent
+        slices = tuple(slices)
+
+        if slices == self.slices:
+            if self.message_item is not None:
+                self.canvas.itemconfig(self.message_item, text=self.empty_text())
+            return
+
+        previous = self.slices
+        self.slices = slices
+        if previous is None or [s[1] for s in slices] != [s[1] for s in previous]:
+            self._create_items()
+        elif len(slices) == 1:
+            # Same counts, new name (language switch): only the center text changes
+            self.canvas.itemconfig(self.items[0][1], text=f"100%\n{slices[0][0]}")
+        self._update_legend()
+        self.layout()
+
+    def _create_items(self):
+        self.canvas.delete('all')
+        self.items = []
+        self.message_item = None
+        self._layout_key = None
+
+        if not self.slices:
+            self.message_item = self.canvas.create_text(
+                0, 0, text=self.empty_text(), font=('Arial', 12), fill='gray', justify='center')
+        elif len(self.slices) == 1:
+            label, _count, _percentage, _start, _extent, color = self.slices[0]
+            oval = self.canvas.create_oval(0, 0, 0, 0, fill=color, outline='white', width=2)
+            text = self.canvas.create_text(0, 0, text=f"100%\n{label}", fill='white', justify='center')
+            self.items.append((oval, text))
+        else:
+            for _label, _count, percentage, start, extent, color in self.slices:
+                if extent <= 0:
+                    self.items.append((None, None))
+                    continue
+                arc = self.canvas.create_arc(0, 0, 0, 0, start=start, extent=extent, fill=color,
+                                             outline='white', width=1, style=tk.PIESLICE)
+                # Small slices get no percentage inside
+                text = (self.canvas.create_text(0, 0, text=f"{percentage:.1f}%", fill='white')
+                        if extent > 15 else None)
+                self.items.append((arc, text))
+
+    def layout(self):
+        """Fits the existing items to the current canvas size"""
+        if self.slices is None:
+            # The canvas was shown before the first set_data
+            return
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if width < self.MIN_SIZE or height < self.MIN_SIZE or (width, height) == self._layout_key:
+            return
+        self._layout_key = (width, height)
+
+        center_x, center_y = width // 2, height // 2
+        if self.message_item is not None:
+            self.canvas.coords(self.message_item, center_x, center_y)
+            return
+
+        radius = min(center_x, center_y) - 30
+        if radius < 10:
+            radius = min(width, height) // 3
+        bbox = (center_x - radius, center_y - radius, center_x + radius, center_y + radius)
+
+        if len(self.slices) == 1:
+            oval, text = self.items[0]
+            self.canvas.coords(oval, *bbox)
+            self.canvas.coords(text, center_x, center_y)
+            self.canvas.itemconfig(text, font=('Arial', max(10, min(14, radius // 10)), 'bold'))
+            return
+
+        font = ('Arial', max(8, min(12, radius // 15)), 'bold')
+        state = 'normal' if radius > 30 else 'hidden'
+        for (shape, text), (_label, _count, _percentage, start, extent, _color) in zip(self.items, self.slices):
+            if shape is None:
+                continue
+            self.canvas.coords(shape, *bbox)
+            if text is not None:
+                # Canvas angles go counterclockwise while y grows downwards
+                middle = math.radians(start + extent / 2)
+                self.canvas.coords(text, center_x + radius * 0.7 * math.cos(middle),
+                                   center_y - radius * 0.7 * math.sin(middle))
+                self.canvas.itemconfig(text, font=font, state=state)
+
+    def _update_legend(self):
+        while len(self.legend_rows) > len(self.slices):
+            self.legend_rows.pop()[0].destroy()
+            self.legend_shown.pop()
+        while len(self.legend_rows) < len(self.slices):
+            frame = ttk.Frame(self.legend_frame)
+            frame.pack(fill='x', padx=5, pady=1)
+            swatch = tk.Canvas(frame, width=16, height=16, highlightthickness=0)
+            swatch.pack(side='left', padx=(0, 5))
+            rectangle = swatch.create_rectangle(2, 2, 14, 14, outline='#666666')
+            label = ttk.Label(frame, font=('Arial', 8), anchor='w')
+            label.pack(side='left', fill='x', expand=True)
+            self.legend_rows.append((frame, swatch, rectangle, label))
+            self.legend_shown.append(None)
+
+        for index, (label, count, percentage, _start, _extent, color) in enumerate(self.slices):
+            shown = (f"{label}: {count} ({percentage:.1f}%)", color)
+            if self.legend_shown[index] != shown:
+                _frame, swatch, rectangle, legend_label = self.legend_rows[index]
+                legend_label.config(text=shown[0])
+                swatch.itemconfig(rectangle, fill=color)
+                self.legend_shown[index] = shown
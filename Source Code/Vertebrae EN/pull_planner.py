@@ -0,0 +1,190 @@
+from gacha_api import (
+    DataManager, BannerClassifier, get_item_name,
+    BANNER_PROMOTIONAL, BANNER_WEAPONS, SPECIAL_BANNERS
+)
+
+# Banner rule sets that have a featured (rate-up) 5★
+RULE_SETS = ("characters", "weapons")
+
+# Banner families covered by each rule set: only the rate-up (promotional)
+# doll and weapon banners, whose featured_rate is what the rules describe.
+# The fixed standard banners (SPECIAL_BANNERS) keep their own counters.
+RULE_SET_FAMILIES = {
+    BANNER_PROMOTIONAL: "characters",
+    BANNER_WEAPONS: "weapons",
+}
+
+PERCENTILES = (0.5, 0.75, 0.9, 0.99)
+
+
+def _convolve(a, b):
+    """Convolves two pull-count distributions (index = number of pulls)"""
+    if len(a) > len(b):
+        a, b = b, a
+    result = [0.0] * (len(a) + len(b) - 1)
+    width = len(b)
+    for offset, weight in enumerate(a):
+        if weight:
+            window = result[offset:offset + width]
+            result[offset:offset + width] = [r + weight * x for r, x in zip(window, b)]
+    return result
+
+
+def _mix(weight_a, a, weight_b, b):
+    """Weighted sum of two distributions of possibly different length"""
+    if len(a) < len(b):
+        a = a + [0.0] * (len(b) - len(a))
+    elif len(b) < len(a):
+        b = b + [0.0] * (len(a) - len(b))
+    return [weight_a * x + weight_b * y for x, y in zip(a, b)]
+
+
+class PullPlanner:
+    """Exact distribution of pulls needed for N featured copies on one banner rule set"""
+
+    def __init__(self, rules):
+        self.base_rate = rules["base_rate"]
+        self.soft_pity_start = rules["soft_pity_start"]
+        self.soft_pity_step = rules["soft_pity_step"]
+        self.hard_pity = rules["hard_pity"]
+        self.featured_rate = rules["featured_rate"]
+
+        # Memo tables shared by every query on this rule set
+        self._hit_cache = {}
+        self._memo = {}
+
+    def rate_at(self, pull):
+        """5★ probability of the n-th pull since the last 5★ (1-based)"""
+        if pull >= self.hard_pity:
+            return 1.0
+        if pull > self.soft_pity_start:
+            return min(1.0, self.base_rate + self.soft_pity_step * (pull - self.soft_pity_start))
+        return self.base_rate
+
+    def hit_distribution(self, pity):
+        """Distribution of pulls until the next 5★ when `pity` pulls have been made without one"""
+        if pity not in self._hit_cache:
+            distribution = [0.0]
+            survival = 1.0
+            for pull in range(pity + 1, self.hard_pity + 1):
+                rate = self.rate_at(pull)
+                distribution.append(survival * rate)
+                survival *= 1.0 - rate
+            self._hit_cache[pity] = distribution
+        return self._hit_cache[pity]
+
+    def distribution(self, pity=0, guaranteed=False, copies=1):
+        """Distribution of pulls needed for `copies` featured 5★ from state (pity, guaranteed)"""
+        pity = max(0, min(int(pity), self.hard_pity - 1))
+        key = (pity, bool(guaranteed), copies)
+        if key in self._memo:
+            return self._memo[key]
+
+        if copies <= 0:
+            result = [1.0]
+        else:
+            first_hit = self.hit_distribution(pity)
+            # After a featured 5★ the next copy starts from scratch
+            won = self.distribution(0, False, copies - 1)
+            if guaranteed:
+                after_hit = won
+            else:
+                # Losing the rate-up resets pity but guarantees the next 5★
+                lost = self.distribution(0, True, copies)
+                after_hit = _mix(self.featured_rate, won, 1.0 - self.featured_rate, lost)
+            result = _convolve(first_hit, after_hit)
+
+        self._memo[key] = result
+        return result
+
+    def plan(self, copies=1, pity=0, guaranteed=False, budget=None):
+        """Summary of the pull distribution for a target"""
+        distribution = self.distribution(pity, guaranteed, copies)
+        return summarize_distribution(distribution, budget)
+
+
+def summarize_distribution(distribution, budget=None):
+    """Expected value, percentiles and worst case of a pull distribution"""
+    expected = sum(pulls * p for pulls, p in enumerate(distribution))
+    variance = sum((pulls - expected) ** 2 * p for pulls, p in enumerate(distribution))
+
+    percentiles = {}
+    pending = list(PERCENTILES)
+    cumulative = 0.0
+    for pulls, p in enumerate(distribution):
+        cumulative += p
+        while pending and cumulative >= pending[0] - 1e-12:
+            percentiles[pending.pop(0)] = pulls
+    for target in pending:
+        percentiles[target] = len(distribution) - 1
+
+    summary = {
+        "expected": expected,
+        "std_dev": variance ** 0.5,
+        "percentiles": percentiles,
+        "worst_case": len(distribution) - 1,
+    }
+    if budget is not None:
+        # A negative budget would slice the distribution from its end
+        budget = max(budget, 0)
+        summary["budget"] = budget
+        summary["success_probability"] = min(1.0, sum(distribution[:budget + 1]))
+    return summary
+
+
+_planners = {}
+
+
+def get_planner(rule_name):
+    """Returns the shared planner for a rule set, rebuilt only if its rules change"""
+    rules = DataManager.load_banner_rules().get(rule_name)
+    if rules is None:
+        raise ValueError(f"Unknown banner rule set: {rule_name}")
+
+    signature = tuple(sorted(rules.items()))
+    cached = _planners.get(rule_name)
+    if cached is None or cached[0] != signature:
+        cached = (signature, PullPlanner(rules))
+        _planners[rule_name] = cached
+    return cached[1]
+
+
+def get_rule_set_for_pool(pool_id):
+    """Maps a pool_id to its rule set ('characters', 'weapons') or None"""
+    if pool_id in SPECIAL_BANNERS:
+        return None
+    return RULE_SET_FAMILIES.get(BannerClassifier.get_family(pool_id))
+
+
+def scan_pity(records, rule_name):
+    """Walks the banners of a rule set in time order: (pulls per 5★, current pity)"""
+    banner_records = [r for r in records if get_rule_set_for_pool(r['pool_id']) == rule_name]
+    # Same order as MultiIndex: newest first, stored order kept inside a multi
+    # (the stored order of a multi is newest first, as the History shows it)
+    banner_records.sort(key=lambda r: (r['time'], r['pool_id']), reverse=True)
+
+    intervals = []
+    pity = 0
+    for record in reversed(banner_records):
+        _, rarity = get_item_name(record['item'])
+        pity += 1
+        if rarity >= 5:
+            intervals.append(pity)
+            pity = 0
+    return intervals, pity
+
+
+def get_current_pity(records, rule_name):
+    """Pulls made since the last 5★ on the banners of a rule set"""
+    return scan_pity(records, rule_name)[1]
+
+
+def advance_pity(pity, newer_records, rule_name):
+    """Current pity after some newer pulls, given the pity before them"""
+    intervals, tail = scan_pity(newer_records, rule_name)
+    return tail if intervals else pity + tail
+
+
+def get_pity_intervals(records, rule_name):
+    """Number of pulls each 5★ took on the banners of a rule set"""
+    return scan_pity(records, rule_name)[0]
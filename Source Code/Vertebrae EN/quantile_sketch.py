@@ -0,0 +1,115 @@
+import math
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch (KLL)
+
+    Values are kept in a stack of compactors. Level h holds items that each
+    stand for 2**h original values. When a level is full it is sorted and
+    every other item is promoted to the next level. Memory stays around
+    3 * k items no matter how many values or sketches are merged into it.
+    The compaction offset alternates per level instead of being random,
+    which keeps results reproducible.
+    """
+
+    def __init__(self, k=200):
+        self.k = k
+        self.n = 0
+        self.compactors = [[]]
+        self.offsets = [0]
+
+    def _capacity(self, level):
+        """Items a level may hold; lower levels get geometrically less room"""
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _size(self):
+        return sum(len(compactor) for compactor in self.compactors)
+
+    def _max_size(self):
+        return sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def _grow(self):
+        self.compactors.append([])
+        self.offsets.append(0)
+
+    def _compress(self):
+        """Compacts full levels until the sketch fits its budget again"""
+        while self._size() >= self._max_size():
+            for level, compactor in enumerate(self.compactors):
+                if len(compactor) >= self._capacity(level):
+                    if level + 1 == len(self.compactors):
+                        self._grow()
+                    compactor.sort()
+                    # With an odd count one item waits for the next compaction
+                    kept = [compactor.pop()] if len(compactor) % 2 else []
+                    offset = self.offsets[level]
+                    self.offsets[level] = 1 - offset
+                    self.compactors[level + 1].extend(compactor[offset::2])
+                    self.compactors[level] = kept
+                    break
+
+    def update(self, value):
+        """Adds one value"""
+        self.compactors[0].append(value)
+        self.n += 1
+        if len(self.compactors[0]) >= self._capacity(0):
+            self._compress()
+
+    def extend(self, values):
+        """Adds many values"""
+        for value in values:
+            self.update(value)
+        return self
+
+    def merge(self, other):
+        """Adds another sketch into this one"""
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level].extend(compactor)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _weighted_items(self):
+        items = []
+        for level, compactor in enumerate(self.compactors):
+            weight = 1 << level
+            items.extend((value, weight) for value in compactor)
+        items.sort()
+        return items
+
+    def rank(self, value):
+        """Approximate fraction of values less than or equal to `value`"""
+        if not self.n:
+            return None
+        total = 0
+        for level, compactor in enumerate(self.compactors):
+            total += (1 << level) * sum(1 for item in compactor if item <= value)
+        return min(1.0, total / self.n)
+
+    def quantile(self, fraction):
+        """Approximate value at a fraction (0-1) of the distribution"""
+        if not self.n:
+            return None
+        items = self._weighted_items()
+        target = fraction * sum(weight for _, weight in items)
+        cumulative = 0
+        for value, weight in items:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return items[-1][0]
+
+    def to_dict(self):
+        """JSON-serializable form"""
+        return {'k': self.k, 'n': self.n, 'compactors': self.compactors, 'offsets': self.offsets}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['k'])
+        sketch.n = data['n']
+        sketch.compactors = [list(compactor) for compactor in data['compactors']]
+        sketch.offsets = list(data['offsets'])
+        return sketch
@@ -0,0 +1,107 @@
+import tkinter as tk
+
+# Keys that move through or close the dropdown instead of changing the text
+NAVIGATION_KEYS = {'Up', 'Down', 'Return', 'Escape', 'Tab', 'Shift_L', 'Shift_R'}
+
+
+class SearchAutocomplete:
+    """Suggestion dropdown under an Entry
+
+    `suggest(text)` is called on every keystroke and must return the list
+    of names to show; it runs on the Tk thread, so it has to be fast (a
+    trie lookup). Picking a suggestion fills the entry and calls
+    `on_select(name)`.
+    """
+
+    def __init__(self, entry, suggest, on_select, max_items=8):
+        self.entry = entry
+        self.suggest = suggest
+        self.on_select = on_select
+        self.max_items = max_items
+        self.popup = None
+        self.listbox = None
+
+        entry.bind('<KeyRelease>', self._on_key, add='+')
+        entry.bind('<Down>', self._focus_list, add='+')
+        entry.bind('<Escape>', lambda e: self.hide(), add='+')
+        entry.bind('<FocusOut>', lambda e: entry.after(150, self._hide_if_unfocused), add='+')
+
+    def _on_key(self, event):
+        if event.keysym in NAVIGATION_KEYS:
+            return
+        text = self.entry.get().strip()
+        suggestions = self.suggest(text) if text else []
+        # Nothing to add if the only suggestion is what is already typed
+        if not suggestions or [s.lower() for s in suggestions] == [text.lower()]:
+            self.hide()
+        else:
+            self.show(suggestions)
+
+    def _create_popup(self):
+        self.popup = tk.Toplevel(self.entry)
+        self.popup.overrideredirect(True)
+        self.popup.transient(self.entry.winfo_toplevel())
+        self.listbox = tk.Listbox(self.popup, activestyle='dotbox', exportselection=False)
+        self.listbox.pack(fill='both', expand=True)
+        self.listbox.bind('<ButtonRelease-1>', self._choose)
+        self.listbox.bind('<Return>', self._choose)
+        self.listbox.bind('<Escape>', lambda e: self._back_to_entry(hide=True))
+        self.listbox.bind('<Up>', self._on_list_up)
+        self.listbox.bind('<FocusOut>', lambda e: self.entry.after(150, self._hide_if_unfocused))
+
+    def show(self, suggestions):
+        """Shows (or updates) the dropdown right below the entry"""
+        if self.popup is None:
+            self._create_popup()
+        self.listbox.delete(0, 'end')
+        for name in suggestions[:self.max_items]:
+            self.listbox.insert('end', name)
+        self.listbox.configure(height=min(len(suggestions), self.max_items))
+
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        width = max(self.entry.winfo_width(), 200)
+        self.popup.geometry(f"{width}x{self.listbox.winfo_reqheight()}+{x}+{y}")
+        self.popup.deiconify()
+        self.popup.lift()
+
+    def hide(self):
+        if self.popup is not None:
+            self.popup.withdraw()
+
+    def is_visible(self):
+        return self.popup is not None and self.popup.winfo_viewable()
+
+    def _focus_list(self, event=None):
+        if self.is_visible() and self.listbox.size():
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, 'end')
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+            return "break"
+
+    def _on_list_up(self, event):
+        if self.listbox.curselection() == (0,):
+            self._back_to_entry()
+            return "break"
+
+    def _back_to_entry(self, hide=False):
+        if hide:
+            self.hide()
+        self.entry.focus_set()
+        self.entry.icursor('end')
+
+    def _choose(self, event=None):
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        name = self.listbox.get(selection[0])
+        self.entry.delete(0, 'end')
+        self.entry.insert(0, name)
+        self._back_to_entry(hide=True)
+        self.on_select(name)
+
+    def _hide_if_unfocused(self):
+        focus = self.entry.focus_get()
+        if focus is not self.entry and focus is not self.listbox:
+            self.hide()